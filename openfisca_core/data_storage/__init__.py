@@ -21,5 +21,6 @@
 #
 # See: https://www.python.org/dev/peps/pep-0008/#imports
 
+from .compressed_array import CompressedArray  # noqa: F401
 from .in_memory_storage import InMemoryStorage  # noqa: F401
 from .on_disk_storage import OnDiskStorage  # noqa: F401
@@ -0,0 +1,129 @@
+import zlib
+
+import numpy
+
+from openfisca_core.indexed_enums import EnumArray
+
+
+class CompressedArray:
+    """
+    Compressed version of a numpy array, kept in memory.
+
+    Depending on the array, the values are:
+
+    - ``'bits'``: bit-packed, for boolean arrays
+    - ``'sparse'``: stored as positions and values of the non-zero items, for arrays which are mostly zeros
+    - ``'zlib'``: compressed with ``zlib``, for instance for arrays with few distinct values
+    - ``'narrow'``: cast to a narrower integer dtype, that fits their range
+
+    Use :any:`CompressedArray.compress` to choose the most compact encoding for an array, or :any:`CompressedArray.narrow` to only narrow its dtype.
+    """
+
+    MAX_RATIO = 0.5  # Arrays are only compressed if they take at most half of their memory once compressed
+    SPARSE_RATIO = 0.1  # Sparse arrays compressed at least that much are not worth trying zlib on
+
+    def __init__(self, encoding, data, dtype, shape, possible_values = None):
+        self.encoding = encoding
+        self.data = data
+        self.dtype = dtype
+        self.shape = shape
+        self.possible_values = possible_values
+
+    @classmethod
+    def compress(cls, array):
+        """
+        Compress ``array`` with the encoding taking the least memory.
+
+        :returns: A :any:`CompressedArray`, or ``None`` if no encoding would take less than ``MAX_RATIO`` of the memory taken by ``array``.
+        """
+        possible_values = array.possible_values if isinstance(array, EnumArray) else None
+        shape = array.shape
+        array = numpy.ascontiguousarray(array.view(numpy.ndarray)).reshape(-1)
+        if array.dtype.hasobject or array.nbytes == 0:
+            return None
+
+        candidates = []
+        if array.dtype == bool:
+            candidates.append(('bits', (numpy.packbits(array),)))
+        else:
+            positions = numpy.flatnonzero(array)
+            positions = positions.astype(numpy.int32 if len(array) < 2 ** 31 else numpy.int64)
+            candidates.append(('sparse', (positions, array[positions])))
+            if _get_nb_bytes(candidates[-1][1]) > cls.SPARSE_RATIO * array.nbytes:
+                candidates.append(('zlib', (zlib.compress(array.view(numpy.uint8), 1),)))
+
+        encoding, data = min(candidates, key = lambda candidate: _get_nb_bytes(candidate[1]))
+        if _get_nb_bytes(data) > cls.MAX_RATIO * array.nbytes:
+            return None
+        return cls(encoding, data, array.dtype, shape, possible_values)
+
+    @classmethod
+    def narrow(cls, array, min_dtype = None):
+        """
+        Bit-pack ``array`` if it is a boolean array, or cast it to the narrowest integer dtype that fits its values if it is an integer array. Both are lossless, and cheap to decode.
+
+        :param min_dtype: Narrowest dtype to consider, to keep the dtype of several arrays consistent.
+
+        :returns: A :any:`CompressedArray`, or ``None`` if ``array`` can't be narrowed.
+        """
+        possible_values = array.possible_values if isinstance(array, EnumArray) else None
+        array = array.view(numpy.ndarray)
+
+        if array.dtype == bool:
+            return cls('bits', (numpy.packbits(array.reshape(-1)),), array.dtype, array.shape, possible_values)
+
+        if array.dtype.kind not in {'i', 'u'} or array.size == 0:
+            return None
+
+        min_value, max_value = array.min(), array.max()
+        for dtype in _NARROW_DTYPES[array.dtype.kind]:
+            if dtype.itemsize >= array.dtype.itemsize:
+                return None
+            if min_dtype is not None and dtype.itemsize < numpy.dtype(min_dtype).itemsize:
+                continue
+            if numpy.iinfo(dtype).min <= min_value and max_value <= numpy.iinfo(dtype).max:
+                return cls('narrow', (array.astype(dtype),), array.dtype, array.shape, possible_values)
+
+        return None
+
+    @property
+    def nbytes(self):
+        """
+        Number of bytes the array takes once decompressed.
+        """
+        return int(numpy.prod(self.shape)) * self.dtype.itemsize
+
+    @property
+    def physical_nb_bytes(self):
+        """
+        Number of bytes the array takes compressed.
+        """
+        return _get_nb_bytes(self.data)
+
+    def decompress(self):
+        size = int(numpy.prod(self.shape))
+        if self.encoding == 'bits':
+            array = numpy.unpackbits(self.data[0], count = size).astype(bool)
+        elif self.encoding == 'sparse':
+            positions, values = self.data
+            array = numpy.zeros(size, dtype = self.dtype)
+            array[positions] = values
+        elif self.encoding == 'narrow':
+            array = self.data[0].astype(self.dtype)
+        else:
+            array = numpy.frombuffer(zlib.decompress(self.data[0]), dtype = self.dtype).copy()
+        array = array.reshape(self.shape)
+
+        if self.possible_values is not None:
+            return EnumArray(array, self.possible_values)
+        return array
+
+
+_NARROW_DTYPES = {
+    'i': [numpy.dtype(numpy.int8), numpy.dtype(numpy.int16), numpy.dtype(numpy.int32)],
+    'u': [numpy.dtype(numpy.uint8), numpy.dtype(numpy.uint16), numpy.dtype(numpy.uint32)],
+    }
+
+
+def _get_nb_bytes(data):
+    return sum(item.nbytes if isinstance(item, numpy.ndarray) else len(item) for item in data)
@@ -1,16 +1,26 @@
 import numpy
 
 from openfisca_core import periods
+from openfisca_core.data_storage import CompressedArray
 
 
 class InMemoryStorage:
     """
     Low-level class responsible for storing and retrieving calculated vectors in memory
+
+    If ``narrow_dtypes`` is ``True``, boolean vectors are stored bit-packed, and integer vectors in the narrowest dtype that fits the values stored so far (see :any:`CompressedArray.narrow`). They are decoded to their original dtype on first access, and the decoded vector is kept, and counted in the memory taken by the storage, until the vector is replaced, deleted or compressed.
+
+    Vectors put with ``shared = True`` are views on memory shared with other processes (see :any:`SharedArrays`). They are stored as they are, never compressed, and don't count in the memory taken by the storage.
     """
 
-    def __init__(self, is_eternal = False):
+    def __init__(self, is_eternal = False, narrow_dtypes = False):
         self._arrays = {}
+        self._cold_periods = set()  # Periods of the arrays compressed by compress(), to decompress on next access
+        self._decoded_arrays = {}  # Narrowed arrays decoded to their original dtype, kept until they are replaced, deleted or compressed
+        self._narrow_dtype = None  # Narrowest dtype of the integer vectors stored so far, only widened
+        self._shared_periods = set()  # Periods of the vectors shared with other processes
         self.is_eternal = is_eternal
+        self.narrow_dtypes = narrow_dtypes
 
     def get(self, period):
         if self.is_eternal:
@@ -20,18 +30,45 @@ class InMemoryStorage:
         values = self._arrays.get(period)
         if values is None:
             return None
+        if isinstance(values, CompressedArray):
+            if period in self._cold_periods:
+                # The array is not cold anymore
+                self._cold_periods.discard(period)
+                values = self._arrays[period] = values.decompress()
+            else:
+                decoded_values = self._decoded_arrays.get(period)
+                if decoded_values is None:
+                    decoded_values = self._decoded_arrays[period] = values.decompress()
+                values = decoded_values
         return values
 
-    def put(self, value, period):
+    def put(self, value, period, shared = False):
         if self.is_eternal:
             period = periods.period(periods.ETERNITY)
         period = periods.period(period)
 
+        if shared:
+            self._shared_periods.add(period)
+        else:
+            self._shared_periods.discard(period)
+
+        if self.narrow_dtypes and not shared:
+            narrowed_value = CompressedArray.narrow(value, self._narrow_dtype)
+            if narrowed_value is not None:
+                if narrowed_value.encoding == 'narrow':
+                    self._narrow_dtype = narrowed_value.data[0].dtype
+                value = narrowed_value
+
         self._arrays[period] = value
+        self._cold_periods.discard(period)
+        self._decoded_arrays.pop(period, None)
 
     def delete(self, period = None):
         if period is None:
             self._arrays = {}
+            self._cold_periods = set()
+            self._decoded_arrays = {}
+            self._shared_periods = set()
             return
 
         if self.is_eternal:
@@ -43,6 +80,50 @@ class InMemoryStorage:
             for period_item, value in self._arrays.items()
             if not period.contains(period_item)
             }
+        self._cold_periods.intersection_update(self._arrays)
+        self._decoded_arrays = {
+            period_item: value
+            for period_item, value in self._decoded_arrays.items()
+            if period_item in self._arrays
+            }
+        self._shared_periods.intersection_update(self._arrays)
+
+    def compress(self, period):
+        """
+        Compress the array stored for ``period``, if it takes significantly less memory compressed. It is decompressed on next access.
+
+        If the array is narrowed, its decoded version is dropped.
+
+        :returns: The number of bytes the array takes in memory
+        """
+        if self.is_eternal:
+            period = periods.period(periods.ETERNITY)
+        period = periods.period(period)
+
+        values = self._arrays[period]
+        self._decoded_arrays.pop(period, None)
+        if not isinstance(values, CompressedArray) and period not in self._shared_periods:
+            compressed_values = CompressedArray.compress(values)
+            if compressed_values is not None:
+                self._arrays[period] = compressed_values
+                self._cold_periods.add(period)
+        return self.get_nb_bytes(period)
+
+    def get_nb_bytes(self, period):
+        """
+        Get the number of bytes the array stored for ``period`` takes in memory.
+        """
+        if self.is_eternal:
+            period = periods.period(periods.ETERNITY)
+        period = periods.period(period)
+
+        if period in self._shared_periods:
+            return 0
+        values = self._arrays[period]
+        if isinstance(values, CompressedArray):
+            decoded_values = self._decoded_arrays.get(period)
+            return values.physical_nb_bytes + (0 if decoded_values is None else decoded_values.nbytes)
+        return values.nbytes
 
     def get_known_periods(self):
         return self._arrays.keys()
@@ -52,6 +133,7 @@ class InMemoryStorage:
             return dict(
                 nb_arrays = 0,
                 total_nb_bytes = 0,
+                physical_nb_bytes = 0,
                 cell_size = numpy.nan,
                 )
 
@@ -59,6 +141,7 @@ class InMemoryStorage:
         array = next(iter(self._arrays.values()))
         return dict(
             nb_arrays = nb_arrays,
-            total_nb_bytes = array.nbytes * nb_arrays,
-            cell_size = array.itemsize,
+            total_nb_bytes = sum(array.nbytes for array in self._arrays.values()),
+            physical_nb_bytes = sum(self.get_nb_bytes(period) for period in self._arrays),
+            cell_size = array.dtype.itemsize,
             )
@@ -1,57 +1,199 @@
+import json
 import os
 import shutil
+import weakref
 
 import numpy
 
 from openfisca_core import periods
-from openfisca_core.indexed_enums import EnumArray
+from openfisca_core.indexed_enums import Enum, EnumArray
 
 
 class OnDiskStorage:
     """
     Low-level class responsible for storing and retrieving calculated vectors on disk
+
+    The vectors of all periods are written one after the other in a single data file, which is preallocated by chunks, and read back as read-only memory-mapped views: reading a value neither copies it nor allocates memory for it.
+
+    The space of overwritten or deleted vectors is reused for new vectors, once no view on them is in use anymore.
+
+    Where each vector lies in the data file, its dtype and shape, and the possible values of enum vectors, are kept in an index, which is written to a file next to the data file by :any:`flush`.
     """
 
+    DATA_FILENAME = 'values.dat'
+    INDEX_FILENAME = 'index.json'
+    ALIGNMENT = 64  # Vectors are aligned in the data file, as they would be in memory
+
     def __init__(self, storage_dir, is_eternal = False, preserve_storage_dir = False):
-        self._files = {}
-        self._enums = {}
+        self._index = {}
+        self._views = {}
+        self._data_size = 0  # Size of the data written so far
+        self._data_capacity = 0  # Size of the preallocated data file
+        self._released = []  # Extents (offset, size, mapping) of vectors that are not indexed anymore, but whose views may still be in use
+        self._free_extents = []  # Extents (offset, size) that can be reused, sorted by offset
+        self._index_changed = False
         self.is_eternal = is_eternal
         self.preserve_storage_dir = preserve_storage_dir
         self.storage_dir = storage_dir
 
-    def _decode_file(self, file):
-        enum = self._enums.get(file)
-        if enum is not None:
-            return EnumArray(numpy.load(file), enum)
+    @property
+    def _data_path(self):
+        return os.path.join(self.storage_dir, self.DATA_FILENAME)
+
+    @property
+    def _index_path(self):
+        return os.path.join(self.storage_dir, self.INDEX_FILENAME)
+
+    def _decode_entry(self, entry):
+        if 'file' in entry:
+            # Vectors that can't be memory-mapped, or that have been dumped by former versions, are stored in their own file
+            value = numpy.load(os.path.join(self.storage_dir, entry['file']), allow_pickle = True)
         else:
-            return numpy.load(file)
+            dtype = numpy.dtype(entry['dtype'])
+            shape = tuple(entry['shape'])
+            if numpy.prod(shape) * dtype.itemsize == 0:
+                value = numpy.empty(shape, dtype = dtype)
+                value.flags.writeable = False
+            else:
+                mapped_value = numpy.memmap(self._data_path, dtype = dtype, mode = 'r', offset = entry['offset'], shape = shape)
+                # Every view on the vector references the mapping, so the space of the vector can be reused once it is garbage collected
+                entry['mapping'] = weakref.ref(mapped_value.base)
+                value = mapped_value.view(numpy.ndarray)
+
+        if 'enum' in entry:
+            if 'possible_values' not in entry:
+                # The vector has been restored from disk: rebuild an enum with the same items, as enum arrays are compared with the items of their variable by name and index
+                entry['possible_values'] = Enum(entry['enum']['name'], entry['enum']['items'])
+            return EnumArray(value, entry['possible_values'])
+        return value
 
     def get(self, period):
         if self.is_eternal:
             period = periods.period(periods.ETERNITY)
         period = periods.period(period)
 
-        values = self._files.get(period)
-        if values is None:
+        value = self._views.get(period)
+        if value is not None:
+            return value
+
+        entry = self._index.get(period)
+        if entry is None:
             return None
-        return self._decode_file(values)
+        value = self._views[period] = self._decode_entry(entry)
+        return value
 
     def put(self, value, period):
         if self.is_eternal:
             period = periods.period(periods.ETERNITY)
         period = periods.period(period)
 
-        filename = str(period)
-        path = os.path.join(self.storage_dir, filename) + '.npy'
+        entry = {}
         if isinstance(value, EnumArray):
-            self._enums[path] = value.possible_values
+            entry['enum'] = {
+                'name': value.possible_values.__name__,
+                'items': [item.name for item in value.possible_values],
+                }
+            entry['possible_values'] = value.possible_values
             value = value.view(numpy.ndarray)
-        numpy.save(path, value)
-        self._files[period] = path
+        value = numpy.asarray(value)
+
+        if value.dtype.hasobject:
+            filename = str(period) + '.npy'
+            numpy.save(os.path.join(self.storage_dir, filename), value)
+            entry['file'] = filename
+        else:
+            entry.update(
+                offset = self._write(numpy.ascontiguousarray(value)),
+                dtype = value.dtype.str,
+                shape = list(value.shape),
+                )
+
+        # The space of the former vector, if any, is only reused once the views already returned for it are not in use anymore
+        self._views.pop(period, None)
+        self._release(self._index.get(period))
+        self._index[period] = entry
+        self._index_changed = True
+
+    def _align(self, size):
+        return -(-size // self.ALIGNMENT) * self.ALIGNMENT
+
+    def _release(self, entry):
+        if entry is None or 'offset' not in entry:
+            return
+        size = int(numpy.prod(entry['shape'])) * numpy.dtype(entry['dtype']).itemsize
+        if size:
+            self._released.append((entry['offset'], size, entry.get('mapping')))
+
+    def _allocate(self, size):
+        # Extents whose views have been garbage collected become free
+        released = []
+        for offset, extent_size, mapping in self._released:
+            if mapping is not None and mapping() is not None:
+                released.append((offset, extent_size, mapping))
+            else:
+                self._free_extents.append((offset, self._align(extent_size)))
+        self._released = released
+
+        # Merge contiguous free extents
+        free_extents = []
+        for offset, extent_size in sorted(self._free_extents):
+            if free_extents and free_extents[-1][0] + free_extents[-1][1] == offset:
+                free_extents[-1] = (free_extents[-1][0], free_extents[-1][1] + extent_size)
+            else:
+                free_extents.append((offset, extent_size))
+        self._free_extents = free_extents
+
+        # Reuse the first free extent large enough, or write after the data written so far
+        size = self._align(size)
+        for position, (offset, extent_size) in enumerate(free_extents):
+            if extent_size >= size:
+                if extent_size > size:
+                    free_extents[position] = (offset + size, extent_size - size)
+                else:
+                    del free_extents[position]
+                return offset
+        return self._align(self._data_size)
+
+    def _write(self, value):
+        offset = self._allocate(value.nbytes)
+        end = offset + value.nbytes
+        if self._data_capacity == 0 and os.path.exists(self._data_path):
+            # Don't overwrite a data file left in the directory, as it may still be mapped by another storage
+            os.remove(self._data_path)
+        with open(self._data_path, 'r+b' if self._data_capacity else 'w+b') as data_file:
+            if end > self._data_capacity:
+                # Preallocate at least as much space as used so far, so that the file is only extended a logarithmic number of times
+                self._data_capacity = max(end, 2 * self._data_capacity)
+                data_file.truncate(self._data_capacity)
+            data_file.seek(offset)
+            data_file.write(value.reshape(-1).view(numpy.uint8).data)
+        self._data_size = max(self._data_size, end)
+        return offset
+
+    def flush(self):
+        """
+        Write the index of the vectors to the storage directory, so that they can be restored with :any:`restore`.
+
+        The index is only written if it has changed since the last call.
+        """
+        if not self._index_changed:
+            return
+        index = [
+            dict(period = str(period), **{key: value for key, value in entry.items() if key not in {'possible_values', 'mapping'}})
+            for period, entry in self._index.items()
+            ]
+        with open(self._index_path, 'w') as index_file:
+            json.dump(index, index_file)
+        self._index_changed = False
 
     def delete(self, period = None):
+        # The space of deleted vectors is only reused once the views on them are not in use anymore
         if period is None:
-            self._files = {}
+            for entry in self._index.values():
+                self._release(entry)
+            self._index = {}
+            self._views = {}
+            self._index_changed = True
             return
 
         if self.is_eternal:
@@ -59,28 +201,51 @@ class OnDiskStorage:
         period = periods.period(period)
 
         if period is not None:
-            self._files = {
+            for period_item, entry in self._index.items():
+                if period.contains(period_item):
+                    self._release(entry)
+            self._index = {
                 period_item: value
-                for period_item, value in self._files.items()
+                for period_item, value in self._index.items()
                 if not period.contains(period_item)
                 }
+            self._views = {
+                period_item: value
+                for period_item, value in self._views.items()
+                if period_item in self._index
+                }
+            self._index_changed = True
 
     def get_known_periods(self):
-        return self._files.keys()
+        return self._index.keys()
 
     def restore(self):
-        self._files = files = {}
-        # Restore self._files from content of storage_dir.
+        self._index = index = {}
+        self._views = {}
+        self._released = []
+        self._free_extents = []
+        self._index_changed = False
+
+        if os.path.exists(self._data_path):
+            self._data_size = self._data_capacity = os.path.getsize(self._data_path)
+
+        # Restore self._index from the index file of storage_dir. Files left for deleted periods are ignored
+        if os.path.exists(self._index_path):
+            with open(self._index_path) as index_file:
+                for entry in json.load(index_file):
+                    index[periods.period(entry.pop('period'))] = entry
+            return
+
+        # Directories dumped by former versions have no index, but one .npy file per period
         for filename in os.listdir(self.storage_dir):
             if not filename.endswith('.npy'):
                 continue
-            path = os.path.join(self.storage_dir, filename)
-            filename_core = filename.rsplit('.', 1)[0]
-            period = periods.period(filename_core)
-            files[period] = path
+            period = periods.period(filename.rsplit('.', 1)[0])
+            index[period] = {'file': filename}
 
     def __del__(self):
         if self.preserve_storage_dir:
+            self.flush()
             return
         shutil.rmtree(self.storage_dir)  # Remove the holder temporary files
         # If the simulation temporary directory is empty, remove it
@@ -0,0 +1,158 @@
+import os
+
+import numpy
+
+
+def _import_shared_memory():
+    # multiprocessing.shared_memory is only available from Python 3.8
+    try:
+        from multiprocessing import resource_tracker, shared_memory
+    except ImportError:
+        raise ImportError("Arrays can only be shared in memory from Python 3.8 onwards. With former versions, share them in a memory-mapped file, by giving a path.")
+    return resource_tracker, shared_memory
+
+
+class SharedArrays:
+    """
+    Named numpy arrays published once in a block of shared memory, or in a memory-mapped file, for several processes to read without copying them.
+
+    Shared memory blocks require Python 3.8 or later. Memory-mapped files can be used with any version.
+
+    Use :any:`SharedArrays.publish` to copy arrays into a new block. The returned object is picklable: it only holds the location of the block and of each array in it, so that it can be sent to other processes, where arrays are read as read-only views on the block.
+
+    Use :any:`SharedArrays.allocate` instead to create arrays that other processes write to.
+
+    The process that published the arrays owns the block, and must :any:`unlink` it once no process needs it anymore.
+
+    Example:
+
+    >>> shared_arrays = SharedArrays.publish({'salary': numpy.array([1000., 2000.])})
+    >>> shared_arrays['salary']  # In any process
+    >>> array([1000., 2000.])
+    """
+
+    ALIGNMENT = 64  # Arrays are aligned in the block, as they would be in memory
+
+    def __init__(self, layout, block_name = None, path = None, writeable = False):
+        self.layout = layout  # Array name -> (offset, dtype, shape)
+        self.block_name = block_name
+        self.path = path
+        self.writeable = writeable
+        self._block = None
+        self._buffer = None
+
+    @classmethod
+    def publish(cls, arrays, path = None):
+        """
+        Copy ``arrays``, a dict of numpy arrays, into a new shared memory block, or into a new file at ``path`` if given.
+
+        Arrays of ``object`` dtype can't be shared.
+        """
+        for name, array in arrays.items():
+            if array.dtype.hasobject:
+                raise TypeError("Array '{}' can't be shared, as its values are Python objects.".format(name))
+        shared_arrays = cls._create({name: (array.dtype, array.shape) for name, array in arrays.items()}, path, writeable = False)
+        for name, array in arrays.items():
+            shared_arrays._get_view(name)[...] = array
+        if path is not None:
+            shared_arrays._buffer.flush()
+        shared_arrays._buffer.flags.writeable = False
+        return shared_arrays
+
+    @classmethod
+    def allocate(cls, specs, path = None):
+        """
+        Create a new block of zero-filled arrays, which every process can write to, for instance to gather results computed in other processes.
+
+        ``specs`` maps the name of each array to its ``(dtype, shape)``. Other parameters are those of :any:`SharedArrays.publish`.
+        """
+        for name, (dtype, _shape) in specs.items():
+            if numpy.dtype(dtype).hasobject:
+                raise TypeError("Array '{}' can't be shared, as its values are Python objects.".format(name))
+        return cls._create(specs, path, writeable = True)
+
+    @classmethod
+    def _create(cls, specs, path, writeable):
+        # New shared memory blocks and files are filled with zeros
+        layout = {}
+        size = 0
+        for name, (dtype, shape) in specs.items():
+            dtype = numpy.dtype(dtype)
+            shape = (shape,) if isinstance(shape, int) else tuple(shape)
+            offset = -(-size // cls.ALIGNMENT) * cls.ALIGNMENT
+            layout[name] = (offset, dtype.str, shape)
+            size = offset + int(numpy.prod(shape)) * dtype.itemsize
+        size = max(size, 1)  # Shared memory blocks and memory-mapped files can't be empty
+
+        if path is None:
+            _resource_tracker, shared_memory = _import_shared_memory()
+            block = shared_memory.SharedMemory(create = True, size = size)
+            shared_arrays = cls(layout, block_name = block.name, writeable = writeable)
+            shared_arrays._block = block
+            shared_arrays._buffer = numpy.ndarray(size, dtype = numpy.uint8, buffer = block.buf)
+        else:
+            shared_arrays = cls(layout, path = path, writeable = writeable)
+            shared_arrays._buffer = numpy.memmap(path, dtype = numpy.uint8, mode = 'w+', shape = size)
+        return shared_arrays
+
+    def __getstate__(self):
+        return dict(layout = self.layout, block_name = self.block_name, path = self.path, writeable = self.writeable, _block = None, _buffer = None)
+
+    def __getitem__(self, name):
+        """
+        Get a view on the array ``name``, which is read-only unless the arrays were created with :any:`SharedArrays.allocate`.
+        """
+        if self._buffer is None:
+            self._attach()
+        view = self._get_view(name)
+        view.flags.writeable = self.writeable
+        return view
+
+    def __contains__(self, name):
+        return name in self.layout
+
+    def keys(self):
+        return self.layout.keys()
+
+    def _attach(self):
+        if self.path is not None:
+            self._buffer = numpy.memmap(self.path, dtype = numpy.uint8, mode = 'r+' if self.writeable else 'r')
+            return
+        resource_tracker, shared_memory = _import_shared_memory()
+        self._block = shared_memory.SharedMemory(name = self.block_name)
+        # The block belongs to the process that published it: don't let this process unlink it when it exits
+        resource_tracker.unregister(self._block._name, 'shared_memory')
+        self._buffer = numpy.ndarray(self._block.size, dtype = numpy.uint8, buffer = self._block.buf)
+        self._buffer.flags.writeable = self.writeable
+
+    def _get_view(self, name):
+        offset, dtype, shape = self.layout[name]
+        dtype = numpy.dtype(dtype)
+        nb_bytes = int(numpy.prod(shape)) * dtype.itemsize
+        return self._buffer[offset:offset + nb_bytes].view(dtype).reshape(shape)
+
+    def close(self):
+        """
+        Stop using the block in this process. Views on the arrays must not be used anymore.
+        """
+        self._buffer = None
+        if self._block is not None:
+            try:
+                self._block.close()
+            except BufferError:
+                # Views are still in use: the block is unmapped once they are garbage collected
+                pass
+            self._block = None
+
+    def unlink(self):
+        """
+        Remove the block, which is freed once every process has closed it. Only the process that published the arrays should call this method.
+        """
+        if self.path is not None:
+            os.remove(self.path)
+        else:
+            _resource_tracker, shared_memory = _import_shared_memory()
+            block = shared_memory.SharedMemory(name = self.block_name)
+            block.unlink()
+            block.close()
+        self.close()
@@ -21,4 +21,5 @@
 #
 # See: https://www.python.org/dev/peps/pep-0008/#imports
 
+from .cache_manager import CacheManager  # noqa: F401
 from .memory_config import MemoryConfig  # noqa: F401
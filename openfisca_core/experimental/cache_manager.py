@@ -0,0 +1,128 @@
+import collections
+
+import psutil
+
+from openfisca_core import periods
+
+
+class CacheManager:
+    """
+    Keeps the values cached in memory by the holders of a simulation within the limits of a :any:`MemoryConfig`.
+
+    The manager records the size of every array cached in memory, and the order in which they are used. When the memory budget is exceeded, the least recently used arrays are spilled to the disk storage of their holder. Arrays of priority variables are never spilled.
+
+    If ``memory_config.compress_cold_arrays`` is set, the least recently used arrays are first compressed in memory, when it is worth it (see :any:`CompressedArray`), and only spilled if that is not enough. Compressed arrays are decompressed on next access.
+
+    The memory budget is ``memory_config.max_memory_bytes``, if any. Besides, the occupation of the system memory is probed every ``memory_config.sampling_interval`` writes: while it is above ``memory_config.max_memory_occupation``, any new array makes the least recently used ones leave the memory.
+    """
+
+    def __init__(self, memory_config):
+        self.memory_config = memory_config
+        self.nb_bytes = 0  # Bytes of the arrays cached in memory
+        self.nb_spilled_arrays = 0
+        self._arrays = collections.OrderedDict()  # (storage, period) -> (holder, nb_bytes) of the arrays that can be spilled, from the least to the most recently used
+        self._pinned_arrays = {}  # (storage, period) -> (holder, nb_bytes) of the arrays of holders without disk storage, which are never spilled
+        self._periods = {}  # storage -> periods of the arrays of the storage, so that they are forgotten without scanning all arrays
+        self._compression_candidates = collections.OrderedDict()  # Keys of the arrays not compressed yet, nor known not to be worth compressing, from the least to the most recently used
+        self._nb_writes = 0
+        self._under_pressure = False
+
+    def record_put(self, holder, period, nb_bytes):
+        """
+        Record that ``holder`` has cached an array of ``nb_bytes`` bytes in memory for ``period``, and spill least recently used arrays if the memory budget is exceeded.
+        """
+        key = self._get_key(holder._memory_storage, period)
+        self._remove(key)
+
+        budget = self.memory_config.max_memory_bytes
+        if self._is_under_pressure():
+            # Don't let the memory usage grow
+            budget = self.nb_bytes if budget is None else min(budget, self.nb_bytes)
+
+        arrays = self._arrays if holder._on_disk_storable else self._pinned_arrays
+        arrays[key] = (holder, nb_bytes)
+        self._periods.setdefault(key[0], set()).add(key[1])
+        self._compression_candidates[key] = None
+        self.nb_bytes += nb_bytes
+
+        if budget is not None and self.nb_bytes > budget:
+            self._spill(budget)
+
+    def record_access(self, storage, period, nb_bytes):
+        """
+        Record that the array cached in ``storage`` for ``period``, which takes ``nb_bytes`` bytes (it may have been decompressed), has been used.
+        """
+        key = self._get_key(storage, period)
+        arrays = self._arrays if key in self._arrays else self._pinned_arrays
+        entry = arrays.get(key)
+        if entry is None:
+            return
+        if arrays is self._arrays:
+            self._arrays.move_to_end(key)
+        if key in self._compression_candidates:
+            self._compression_candidates.move_to_end(key)
+        holder, previous_nb_bytes = entry
+        if nb_bytes != previous_nb_bytes:
+            arrays[key] = (holder, nb_bytes)
+            self.nb_bytes += nb_bytes - previous_nb_bytes
+            self._compression_candidates[key] = None
+
+    def forget(self, storage, period = None):
+        """
+        Forget the arrays deleted from ``storage``, with the same semantics as :any:`InMemoryStorage.delete`.
+        """
+        if period is not None:
+            period = self._get_key(storage, period)[1]
+
+        storage_periods = self._periods.get(storage, ())
+        for period_item in [period_item for period_item in storage_periods if period is None or period.contains(period_item)]:
+            self._remove((storage, period_item))
+
+    def get_memory_usage(self):
+        return dict(
+            nb_arrays = len(self._arrays) + len(self._pinned_arrays),
+            total_nb_bytes = self.nb_bytes,
+            nb_spilled_arrays = self.nb_spilled_arrays,
+            )
+
+    def _get_key(self, storage, period):
+        if storage.is_eternal:
+            return storage, periods.period(periods.ETERNITY)
+        return storage, periods.period(period)
+
+    def _remove(self, key):
+        entry = self._arrays.pop(key, None) or self._pinned_arrays.pop(key, None)
+        if entry is None:
+            return
+        self.nb_bytes -= entry[1]
+        self._compression_candidates.pop(key, None)
+        storage_periods = self._periods[key[0]]
+        storage_periods.discard(key[1])
+        if not storage_periods:
+            del self._periods[key[0]]
+
+    def _is_under_pressure(self):
+        # Probing the system memory is a system call: only do it once in a while
+        if self._nb_writes % self.memory_config.sampling_interval == 0:
+            self._under_pressure = psutil.virtual_memory().percent >= self.memory_config.max_memory_occupation_pc
+        self._nb_writes += 1
+        return self._under_pressure
+
+    def _spill(self, budget):
+        if self.memory_config.compress_cold_arrays:
+            # Each array is only tried once, until it is decompressed or replaced
+            while self.nb_bytes > budget and self._compression_candidates:
+                key, _ = self._compression_candidates.popitem(last = False)
+                arrays = self._arrays if key in self._arrays else self._pinned_arrays
+                holder, nb_bytes = arrays[key]
+                storage, period = key
+                compressed_nb_bytes = storage.compress(period)
+                arrays[key] = (holder, compressed_nb_bytes)
+                self.nb_bytes += compressed_nb_bytes - nb_bytes
+
+        # Only arrays that can be spilled are candidates
+        while self.nb_bytes > budget and self._arrays:
+            key, (holder, _nb_bytes) = next(iter(self._arrays.items()))
+            holder._spill(key[1])
+            self._remove(key)
+            self.nb_spilled_arrays += 1
@@ -8,7 +8,11 @@ class MemoryConfig:
     def __init__(self,
       max_memory_occupation,
       priority_variables = None,
-      variables_to_drop = None):
+      variables_to_drop = None,
+      max_memory_bytes = None,
+      sampling_interval = 100,
+      compress_cold_arrays = False,
+      narrow_dtypes = False):
         log.warn("Memory configuration is a feature that is still currently under experimentation. You are very welcome to use it and send us precious feedback, but keep in mind that the way it is used might change without any major version bump.")
 
         self.max_memory_occupation = float(max_memory_occupation)
@@ -17,3 +21,7 @@ class MemoryConfig:
         self.max_memory_occupation_pc = self.max_memory_occupation * 100
         self.priority_variables = set(priority_variables) if priority_variables else set()
         self.variables_to_drop = set(variables_to_drop) if variables_to_drop else set()
+        self.max_memory_bytes = max_memory_bytes  # Budget for the values cached in memory by a simulation
+        self.sampling_interval = sampling_interval  # Number of cache writes between two probes of the system memory occupation
+        self.compress_cold_arrays = compress_cold_arrays  # Compress the least recently used arrays before spilling them to disk
+        self.narrow_dtypes = narrow_dtypes  # Store boolean arrays bit-packed, and integer arrays in the narrowest dtype that fits their values
@@ -2,7 +2,6 @@ import os
 import warnings
 
 import numpy
-import psutil
 
 from openfisca_core import commons, periods, tools
 from openfisca_core.errors import PeriodMismatchError
@@ -19,22 +18,33 @@ class Holder:
         self.population = population
         self.variable = variable
         self.simulation = population.simulation
-        self._memory_storage = InMemoryStorage(is_eternal = (self.variable.definition_period == periods.ETERNITY))
+        self._memory_storage = InMemoryStorage(
+            is_eternal = (self.variable.definition_period == periods.ETERNITY),
+            narrow_dtypes = bool(self.simulation and self.simulation.memory_config and self.simulation.memory_config.narrow_dtypes),
+            )
 
         # By default, do not activate on-disk storage, or variable dropping
         self._disk_storage = None
         self._on_disk_storable = False
         self._do_not_store = False
+        self._cache_manager = None
+        self._parent = None  # Holder of a parent simulation, which values are read when they are not known by this holder
+        self._hidden_periods = set()  # Periods for which the values of the parent are outdated
         if self.simulation and self.simulation.memory_config:
+            self._cache_manager = self.simulation.cache_manager
             if self.variable.name not in self.simulation.memory_config.priority_variables:
                 self._disk_storage = self.create_disk_storage()
                 self._on_disk_storable = True
             if self.variable.name in self.simulation.memory_config.variables_to_drop:
                 self._do_not_store = True
 
-    def clone(self, population):
+    def clone(self, population, variable = None):
         """
         Copy the holder just enough to be able to run a new simulation without modifying the original simulation.
+
+        The copy is copy-on-write: it reads the values of this holder, and keeps the values set in the new simulation in storages of its own.
+
+        :param variable: The variable of the new holder, if it has been replaced, for instance by a reform. The values of this holder are only read if it has the same definition period.
         """
         new = commons.empty_clone(self)
         new_dict = new.__dict__
@@ -45,6 +55,17 @@ class Holder:
 
         new_dict['population'] = population
         new_dict['simulation'] = population.simulation
+        if variable is not None:
+            new_dict['variable'] = variable
+
+        new._memory_storage = InMemoryStorage(
+            is_eternal = (new.variable.definition_period == periods.ETERNITY),
+            narrow_dtypes = self._memory_storage.narrow_dtypes,
+            )
+        if self._disk_storage is not None:
+            new._disk_storage = new.create_disk_storage()
+        new._parent = self if new.variable.definition_period == self.variable.definition_period else None
+        new._hidden_periods = set()
 
         return new
 
@@ -68,8 +89,20 @@ class Holder:
         """
 
         self._memory_storage.delete(period)
+        if self._cache_manager is not None:
+            self._cache_manager.forget(self._memory_storage, period)
         if self._disk_storage:
             self._disk_storage.delete(period)
+        if self._parent is not None:
+            # Values of the parent are not deleted, but they aren't read anymore
+            if period is None or self.variable.definition_period == periods.ETERNITY:
+                self._parent = None
+            else:
+                period = periods.period(period)
+                self._hidden_periods.update(
+                    known_period for known_period in self._parent.get_known_periods()
+                    if period.contains(known_period)
+                    )
 
     def get_array(self, period):
         """
@@ -81,9 +114,21 @@ class Holder:
             return self.default_array()
         value = self._memory_storage.get(period)
         if value is not None:
+            if self._cache_manager is not None:
+                self._cache_manager.record_access(self._memory_storage, period, self._memory_storage.get_nb_bytes(period))
             return value
         if self._disk_storage:
-            return self._disk_storage.get(period)
+            value = self._disk_storage.get(period)
+            if value is not None:
+                return value
+        if self._parent is not None and not self._is_hidden(period):
+            return self._parent.get_array(period)
+        return None
+
+    def _is_hidden(self, period):
+        if not self._hidden_periods:
+            return False
+        return periods.period(period) in self._hidden_periods
 
     def get_memory_usage(self):
         """
@@ -101,6 +146,7 @@ class Holder:
         >>>    'cell_size': 8,  # Each value takes 8B of memory
         >>>    'dtype': dtype('float64')  # Each value is a float 64
         >>>    'total_nb_bytes': 10400  # The holder uses 10.4kB of virtual memory
+        >>>    'physical_nb_bytes': 5200  # Once compressed, the arrays actually take 5.2kB of memory
         >>>    'nb_requests': 24  # The variable has been computed 24 times
         >>>    'nb_requests_by_array': 2  # Each array stored has been on average requested twice
         >>>    }
@@ -127,8 +173,14 @@ class Holder:
         Get the list of periods the variable value is known for.
         """
 
-        return list(self._memory_storage.get_known_periods()) + list((
+        known_periods = list(self._memory_storage.get_known_periods()) + list((
             self._disk_storage.get_known_periods() if self._disk_storage else []))
+        if self._parent is not None:
+            known_periods += [
+                period for period in self._parent.get_known_periods()
+                if period not in known_periods and not self._is_hidden(period)
+                ]
+        return known_periods
 
     def set_input(self, period, array):
         """
@@ -174,6 +226,14 @@ class Holder:
             return self.variable.set_input(self, period, array)
         return self._set(period, array)
 
+    def set_shared_input(self, period, array):
+        """
+        Set a read-only view (``array``) on values shared with other processes (see :any:`SharedArrays`) as the input of the variable for ``period``, without copying it.
+
+        Unlike with :any:`set_input`, the values must already match the dtype of the variable, and the period its ``definition_period``. Otherwise, they are copied.
+        """
+        self._set(periods.period(period), array, shared = True)
+
     def _to_array(self, value):
         if not isinstance(value, numpy.ndarray):
             value = numpy.asarray(value)
@@ -195,8 +255,11 @@ class Holder:
                     .format(value, self.variable.name, self.variable.dtype, value.dtype))
         return value
 
-    def _set(self, period, value):
-        value = self._to_array(value)
+    def _set(self, period, value, shared = False):
+        array = self._to_array(value)
+        # Values which had to be converted are not shared anymore
+        shared = shared and numpy.may_share_memory(array, value)
+        value = array
         if self.variable.definition_period != periods.ETERNITY:
             if period is None:
                 raise ValueError('A period must be specified to set values, except for variables with periods.ETERNITY as as period_definition.')
@@ -216,16 +279,21 @@ class Holder:
                     error_message
                     )
 
-        should_store_on_disk = (
-            self._on_disk_storable and
-            self._memory_storage.get(period) is None and  # If there is already a value in memory, replace it and don't put a new value in the disk storage
-            psutil.virtual_memory().percent >= self.simulation.memory_config.max_memory_occupation_pc
-            )
+        self._memory_storage.put(value, period, shared = shared)
+        if self._cache_manager is not None:
+            if shared:
+                # Shared values don't take memory of this process
+                self._cache_manager.forget(self._memory_storage, period)
+            else:
+                # May spill this value, or older ones, to the disk storage
+                self._cache_manager.record_put(self, period, self._memory_storage.get_nb_bytes(period))
 
-        if should_store_on_disk:
-            self._disk_storage.put(value, period)
-        else:
-            self._memory_storage.put(value, period)
+    def _spill(self, period):
+        """
+        Move the value cached in memory for ``period`` to the disk storage.
+        """
+        self._disk_storage.put(self._memory_storage.get(period), period)
+        self._memory_storage.delete(period)
 
     def put_in_cache(self, value, period):
         if self._do_not_store:
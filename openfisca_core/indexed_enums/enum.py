@@ -14,6 +14,9 @@ class Enum(enum.Enum):
     index.
     """
 
+    # Lookup tables of the items, set by _get_lookup_tables on each enum. Only annotated, as a value would make it an item.
+    _lookup_tables: typing.Optional[_LookupTables]
+
     # Tweak enums to add an index attribute to each enum item
     def __init__(self, name: str) -> None:
         # When the enum item is initialized, self._member_names_ contains the names of
@@ -63,10 +66,12 @@ class Enum(enum.Enum):
             return array
 
         if array.dtype.kind in {'U', 'S'}:  # String array
-            array = numpy.select(
-                [array == item.name for item in cls],
-                [item.index for item in cls],
-                ).astype(config.ENUM_ARRAY_DTYPE)
+            tables = cls._get_lookup_tables()
+            array = _encode_with_table(
+                array.astype(str),
+                tables.sorted_names,
+                tables.sorted_names_indices,
+                )
 
         elif array.dtype.kind == 'O':  # Enum items arrays
             # Ensure we are comparing the comparable. The problem this fixes:
@@ -80,9 +85,64 @@ class Enum(enum.Enum):
             if len(array) > 0 and cls.__name__ is array[0].__class__.__name__:
                 cls = array[0].__class__
 
-            array = numpy.select(
-                [array == item for item in cls],
-                [item.index for item in cls],
-                ).astype(config.ENUM_ARRAY_DTYPE)
+            # Enum items are compared by identity, so they are looked up by id
+            tables = cls._get_lookup_tables()
+            ids = numpy.fromiter(map(id, array.flat), dtype = numpy.uint64, count = array.size)
+            array = _encode_with_table(
+                ids.reshape(array.shape),
+                tables.sorted_ids,
+                tables.sorted_ids_indices,
+                )
 
         return EnumArray(array, cls)
+
+    @classmethod
+    def _get_lookup_tables(cls) -> _LookupTables:
+        """
+        Get the tables used to encode and decode arrays of the enum items.
+
+        These tables are computed once per enum, as enum items can't change.
+        """
+        tables = cls.__dict__.get('_lookup_tables')
+
+        if tables is None:
+            items = numpy.array(list(cls), dtype = object)
+            names = numpy.array([item.name for item in items])
+            ids = numpy.array([id(item) for item in items], dtype = numpy.uint64)
+            names_order = numpy.argsort(names)
+            ids_order = numpy.argsort(ids)
+            tables = _LookupTables(
+                items = items,
+                names = names,
+                sorted_names = names[names_order],
+                sorted_names_indices = names_order.astype(config.ENUM_ARRAY_DTYPE),
+                sorted_ids = ids[ids_order],
+                sorted_ids_indices = ids_order.astype(config.ENUM_ARRAY_DTYPE),
+                )
+            cls._lookup_tables = tables
+
+        return tables
+
+
+class _LookupTables(typing.NamedTuple):
+    items: numpy.ndarray  # Items, ordered by index
+    names: numpy.ndarray  # Names of the items, ordered by index
+    sorted_names: numpy.ndarray
+    sorted_names_indices: numpy.ndarray
+    sorted_ids: numpy.ndarray
+    sorted_ids_indices: numpy.ndarray
+
+
+def _encode_with_table(
+        array: numpy.ndarray,
+        sorted_keys: numpy.ndarray,
+        sorted_keys_indices: numpy.ndarray,
+        ) -> numpy.ndarray:
+    # Binary search of each value among the keys of the items. Unknown values are
+    # encoded as 0, the index of the first item.
+    positions = numpy.searchsorted(sorted_keys, array).clip(max = len(sorted_keys) - 1)
+    return numpy.where(
+        sorted_keys[positions] == array,
+        sorted_keys_indices[positions],
+        0,
+        ).astype(config.ENUM_ARRAY_DTYPE)
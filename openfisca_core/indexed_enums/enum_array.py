@@ -6,6 +6,7 @@ import numpy
 
 if typing.TYPE_CHECKING:
     from openfisca_core.indexed_enums import Enum
+    from openfisca_core.indexed_enums.enum import _LookupTables
 
 
 class EnumArray(numpy.ndarray):
@@ -74,10 +75,8 @@ class EnumArray(numpy.ndarray):
         >>> enum_array.decode()[0]
         <HousingOccupancyStatus.free_lodger: 'Free lodger'>  # Decoded value : enum item
         """
-        return numpy.select(
-            [self == item.index for item in self.possible_values],
-            list(self.possible_values),
-            )
+        items = self._get_lookup_tables().items
+        return items.take(self._get_indices())
 
     def decode_to_str(self) -> numpy.ndarray[str]:
         """
@@ -91,10 +90,23 @@ class EnumArray(numpy.ndarray):
         >>> enum_array.decode_to_str()[0]
         'free_lodger'  # String identifier
         """
-        return numpy.select(
-            [self == item.index for item in self.possible_values],
-            [item.name for item in self.possible_values],
-            )
+        names = self._get_lookup_tables().names
+        return names.take(self._get_indices())
+
+    def _get_lookup_tables(self) -> _LookupTables:
+        if self.possible_values is None:
+            raise TypeError("This EnumArray can't be decoded, as it has no possible values.")
+
+        return self.possible_values._get_lookup_tables()
+
+    def _get_indices(self) -> numpy.ndarray:
+        indices = self.view(numpy.ndarray)
+
+        # Aggregates, such as means, may not be integers anymore
+        if indices.dtype.kind not in {'i', 'u'}:
+            return indices.astype(int)
+
+        return indices
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({str(self.decode())})"
@@ -9,7 +9,7 @@ from openfisca_core.parameters import config
 
 
 def contains_nan(vector):
-    if numpy.issubdtype(vector.dtype, numpy.record):
+    if vector.dtype.names is not None:
         return any([contains_nan(vector[name]) for name in vector.dtype.names])
     else:
         return numpy.isnan(vector).any()
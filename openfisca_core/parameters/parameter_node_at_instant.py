@@ -11,6 +11,8 @@ from openfisca_core.parameters import helpers
 class ParameterNodeAtInstant:
     """
     Parameter node of the legislation, at a given instant.
+
+    Children are only evaluated at the instant when they are first accessed, and are then memoised, so that getting the parameters at an instant does not walk the whole parameter tree.
     """
 
     def __init__(self, name, node, instant_str):
@@ -23,26 +25,61 @@ class ParameterNodeAtInstant:
         # The "technical" attributes are hidden, so that the node children can be easily browsed with auto-completion without pollution
         self._name = name
         self._instant_str = instant_str
-        self._children = {}
+        self._node = node
+        self._resolved_children = {}  # Children evaluated so far, including the ones that have no value at this instant (as None)
+        self._all_children = None  # Every child that has a value at this instant, once they have all been evaluated
+        self._vectorial_node = None  # Vectorial version of the node, built on first fancy indexing
+
+    @property
+    def _children(self):
+        if self._all_children is None:
+            all_children = {}
+            for child_name in self._node.children:
+                child_at_instant = self._get_child(child_name)
+                if child_at_instant is not None:
+                    all_children[child_name] = child_at_instant
+            for child_name, child_at_instant in self._resolved_children.items():
+                if child_at_instant is not None and child_name not in all_children:  # Children added with add_child
+                    all_children[child_name] = child_at_instant
+            self._all_children = all_children
+        return self._all_children
 
-        for child_name, child in node.children.items():
-            child_at_instant = child._get_at_instant(instant_str)
-            if child_at_instant is not None:
-                self.add_child(child_name, child_at_instant)
+    def _get_child(self, child_name):
+        if child_name in self._resolved_children:
+            return self._resolved_children[child_name]
+        child = self._node.children.get(child_name)
+        child_at_instant = child._get_at_instant(self._instant_str) if child is not None else None
+        self._resolved_children[child_name] = child_at_instant
+        if child_at_instant is not None:
+            setattr(self, child_name, child_at_instant)  # Next accesses won't go through __getattr__
+        return child_at_instant
 
     def add_child(self, child_name, child_at_instant):
-        self._children[child_name] = child_at_instant
+        self._resolved_children[child_name] = child_at_instant
+        if self._all_children is not None:
+            self._all_children[child_name] = child_at_instant
         setattr(self, child_name, child_at_instant)
+        self._vectorial_node = None
 
     def __getattr__(self, key):
-        param_name = helpers._compose_name(self._name, item_name = key)
-        raise ParameterNotFoundError(param_name, self._instant_str)
+        if key.startswith('__') or key in ('_node', '_resolved_children', '_all_children', '_vectorial_node'):
+            raise AttributeError(key)
+        child_at_instant = self._get_child(key)
+        if child_at_instant is None:
+            param_name = helpers._compose_name(self._name, item_name = key)
+            raise ParameterNotFoundError(param_name, self._instant_str)
+        return child_at_instant
 
     def __getitem__(self, key):
         # If fancy indexing is used, cast to a vectorial node
         if isinstance(key, numpy.ndarray):
-            return parameters.VectorialParameterNodeAtInstant.build_from_node(self)[key]
-        return self._children[key]
+            if self._vectorial_node is None:
+                self._vectorial_node = parameters.VectorialParameterNodeAtInstant.build_from_node(self)
+            return self._vectorial_node[key]
+        child_at_instant = self._get_child(key)
+        if child_at_instant is None:
+            raise KeyError(key)
+        return child_at_instant
 
     def __iter__(self):
         return iter(self._children)
@@ -3,7 +3,6 @@ import numpy
 from openfisca_core import parameters
 from openfisca_core.errors import ParameterNotFoundError
 from openfisca_core.indexed_enums import Enum, EnumArray
-from openfisca_core.parameters import helpers
 
 
 class VectorialParameterNodeAtInstant:
@@ -131,6 +130,11 @@ class VectorialParameterNodeAtInstant:
         self.vector = vector
         self._name = name
         self._instant_str = instant_str
+        # Lookup tables, built on first fancy indexing
+        self._sorted_names = None
+        self._sorted_names_indices = None
+        self._stacked_values = None
+        self._enum_tables = {}
 
     def __getattr__(self, attribute):
         result = getattr(self.vector, attribute)
@@ -144,27 +148,77 @@ class VectorialParameterNodeAtInstant:
             return self.__getattr__(key)
         # If the key is a vector, e.g. ['zone_1', 'zone_2', 'zone_1']
         elif isinstance(key, numpy.ndarray):
-            if not numpy.issubdtype(key.dtype, numpy.str_):
-                # In case the key is not a string vector, stringify it
-                if key.dtype == object and issubclass(type(key[0]), Enum):
-                    enum = type(key[0])
-                    key = numpy.select([key == item for item in enum], [item.name for item in enum])
-                elif isinstance(key, EnumArray):
-                    enum = key.possible_values
-                    key = numpy.select([key == item.index for item in enum], [item.name for item in enum])
-                else:
-                    key = key.astype('str')
-            names = list(self.dtype.names)  # Get all the names of the subnodes, e.g. ['zone_1', 'zone_2']
-            default = numpy.full_like(self.vector[key[0]], numpy.nan)  # In case of unexpected key, we will set the corresponding value to NaN.
-            conditions = [key == name for name in names]
-            values = [self.vector[name] for name in names]
-            result = numpy.select(conditions, values, default)
-            if helpers.contains_nan(result):
-                unexpected_key = set(key).difference(self.vector.dtype.names).pop()
-                raise ParameterNotFoundError('.'.join([self._name, unexpected_key]), self._instant_str)
+            names = self.dtype.names  # Get all the names of the subnodes, e.g. ['zone_1', 'zone_2']
+            indices = self._get_children_indices(key)
+
+            unexpected = indices < 0
+            if unexpected.any():
+                unexpected_key = (key.decode_to_str() if isinstance(key, EnumArray) else key)[unexpected][0]
+                raise ParameterNotFoundError('.'.join([self._name, getattr(unexpected_key, 'name', str(unexpected_key))]), self._instant_str)
+
+            stacked_values = self._get_stacked_values()
+            if stacked_values is None:
+                result = self._select(indices, names)
+            else:
+                # One gather in the (child, row) table of values. If the node has a single row, it is shared by all the keys.
+                rows = 0 if len(self.vector) == 1 else numpy.arange(len(self.vector))
+                result = stacked_values[indices, rows]
 
             # If the result is not a leaf, wrap the result in a vectorial node.
-            if numpy.issubdtype(result.dtype, numpy.record):
+            if result.dtype.names is not None:
                 return VectorialParameterNodeAtInstant(self._name, result.view(numpy.recarray), self._instant_str)
 
             return result
+
+    def _get_children_indices(self, key):
+        """
+        Get, for each item of ``key``, the index of the corresponding child in ``self.dtype.names``, or -1 if there is no such child.
+        """
+        if isinstance(key, EnumArray):
+            # Enum indices are translated with a table computed once per Enum
+            enum = key.possible_values
+            enum_table = self._enum_tables.get(enum)
+            if enum_table is None:
+                enum_table = self._get_names_indices(numpy.array([item.name for item in enum]))
+                self._enum_tables[enum] = enum_table
+            return enum_table[key.view(numpy.ndarray)]
+
+        if key.dtype == object and len(key) and isinstance(key[0], Enum):
+            key = numpy.array([item.name for item in key])
+
+        if numpy.issubdtype(key.dtype, numpy.str_):
+            return self._get_names_indices(key)
+
+        # In case the key is not a string vector, stringify its distinct values only
+        unique_keys, inverse = numpy.unique(key, return_inverse = True)
+        return self._get_names_indices(unique_keys.astype('str'))[inverse]
+
+    def _get_names_indices(self, key):
+        if self._sorted_names is None:
+            names = numpy.array(self.dtype.names)
+            self._sorted_names_indices = numpy.argsort(names)
+            self._sorted_names = names[self._sorted_names_indices]
+        positions = numpy.searchsorted(self._sorted_names, key).clip(max = len(self._sorted_names) - 1)
+        return numpy.where(
+            self._sorted_names[positions] == key,
+            self._sorted_names_indices[positions],
+            -1,
+            )
+
+    def _get_stacked_values(self):
+        """
+        Stack the children values in a (child, row) array, or return ``None`` if the children can't be stacked, as they are subnodes that don't share the same structure.
+        """
+        if self._stacked_values is None:
+            children_values = [self.vector[name] for name in self.dtype.names]
+            try:
+                self._stacked_values = numpy.stack(children_values)
+            except TypeError:
+                return None
+        return self._stacked_values
+
+    def _select(self, indices, names):
+        default = numpy.full_like(self.vector[names[0]], numpy.nan)
+        conditions = [indices == index for index in range(len(names))]
+        values = [self.vector[name] for name in names]
+        return numpy.select(conditions, values, default)
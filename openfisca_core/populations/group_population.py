@@ -14,33 +14,50 @@ class GroupPopulation(Population):
         self.members = members
         self._members_entity_id = None
         self._members_role = None
+        self._members_role_index = None
+        self._roles_table = list(entity.flattened_roles)
+        self._role_masks = {}
         self._members_position = None
         self._ordered_members_map = None
 
     def clone(self, simulation):
         result = GroupPopulation(self.entity, self.members)
         result.simulation = simulation
-        result._holders = {variable: holder.clone(self) for (variable, holder) in self._holders.items()}
+        result._holders = self._clone_holders(result)
         result.count = self.count
         result.ids = self.ids
         result._members_entity_id = self._members_entity_id
         result._members_role = self._members_role
+        result._members_role_index = self._members_role_index
+        result._roles_table = self._roles_table
+        result._role_masks = dict(self._role_masks)
         result._members_position = self._members_position
         result._ordered_members_map = self._ordered_members_map
         return result
 
+    def get_subset(self, rows, members, members_rows):
+        """
+        Build a population made of the entities at ``rows`` only, without any value.
+
+        ``members`` is the subset of the members of this population at ``members_rows``, which must include every member of the entities at ``rows``.
+        """
+        result = GroupPopulation(self.entity, members)
+        ids = numpy.asarray(self.ids)[rows]
+        result.ids = ids.tolist() if isinstance(self.ids, list) else ids
+        result.count = len(rows)
+
+        # Index of each entity in the subset
+        subset_index = numpy.full(self.count, -1, dtype = self.members_entity_id.dtype)
+        subset_index[rows] = numpy.arange(len(rows))
+        result.members_entity_id = subset_index[self.members_entity_id[members_rows]]
+        result._roles_table = list(self._roles_table)
+        result._set_members_role_index(self.members_role_index[members_rows])
+        return result
+
     @property
     def members_position(self):
         if self._members_position is None and self.members_entity_id is not None:
-            # We could use self.count and self.members.count , but with the current initilization, we are not sure count will be set before members_position is called
-            nb_entities = numpy.max(self.members_entity_id) + 1
-            nb_persons = len(self.members_entity_id)
-            self._members_position = numpy.empty_like(self.members_entity_id)
-            counter_by_entity = numpy.zeros(nb_entities)
-            for k in range(nb_persons):
-                entity_index = self.members_entity_id[k]
-                self._members_position[k] = counter_by_entity[entity_index]
-                counter_by_entity[entity_index] += 1
+            self._compute_members_order()
 
         return self._members_position
 
@@ -55,18 +72,70 @@ class GroupPopulation(Population):
     @members_entity_id.setter
     def members_entity_id(self, members_entity_id):
         self._members_entity_id = members_entity_id
+        # Positions and ordering depend on the memberships, they are recomputed on next access
+        self._members_position = None
+        self._ordered_members_map = None
 
     @property
     def members_role(self):
         if self._members_role is None:
-            default_role = self.entity.flattened_roles[0]
-            self._members_role = numpy.repeat(default_role, len(self.members_entity_id))
+            roles_table = numpy.empty(len(self._roles_table), dtype = object)
+            roles_table[:] = self._roles_table
+            self._members_role = roles_table[self.members_role_index]
         return self._members_role
 
     @members_role.setter
     def members_role(self, members_role: typing.Iterable[Role]):
         if members_role is not None:
-            self._members_role = numpy.array(list(members_role))
+            # Copying an array of roles is much faster than building it from a list, as numpy doesn't inspect each role
+            members_role = numpy.array(members_role if isinstance(members_role, numpy.ndarray) else list(members_role))
+            self._roles_table = list(self.entity.flattened_roles)
+            members_role_index = numpy.full(len(members_role), -1, dtype = numpy.int16)
+            for code, role in enumerate(self._roles_table):
+                members_role_index[members_role == role] = code
+            # Roles that are not flattened roles of the entity are appended to the table of roles of this population
+            for person_index in numpy.nonzero(members_role_index == -1)[0]:
+                role = members_role[person_index]
+                if not any(role is known_role for known_role in self._roles_table):
+                    self._roles_table.append(role)
+                members_role_index[person_index] = next(code for code, known_role in enumerate(self._roles_table) if role is known_role)
+            self._set_members_role_index(members_role_index)
+            self._members_role = members_role
+
+    @property
+    def members_role_index(self):
+        """
+        Roles of the members, encoded as their index in ``entity.flattened_roles``.
+        """
+        if self._members_role_index is None:
+            # By default, every person has the first role of the entity
+            self._set_members_role_index(numpy.zeros(len(self.members_entity_id), dtype = numpy.int16))
+        return self._members_role_index
+
+    @members_role_index.setter
+    def members_role_index(self, members_role_index):
+        self._roles_table = list(self.entity.flattened_roles)
+        self._set_members_role_index(numpy.asarray(members_role_index, dtype = numpy.int16))
+
+    def _set_members_role_index(self, members_role_index):
+        self._members_role_index = members_role_index
+        self._members_role = None
+        self._role_masks = {}
+
+    def get_role_mask(self, role):
+        """
+        Get a read-only boolean mask of the members having ``role``, or one of its subroles.
+
+        Masks are cached until the roles of the members change.
+        """
+        mask = self._role_masks.get(role)
+        if mask is None:
+            roles = role.subroles or [role]
+            codes = [code for code, known_role in enumerate(self._roles_table) if any(known_role is role for role in roles)]
+            mask = numpy.isin(self.members_role_index, codes)
+            mask.flags.writeable = False
+            self._role_masks[role] = mask
+        return mask
 
     @property
     def ordered_members_map(self):
@@ -75,9 +144,29 @@ class GroupPopulation(Population):
         This function only caches the map value, to see what the map is used for, see value_nth_person method.
         """
         if self._ordered_members_map is None:
-            self._ordered_members_map = numpy.argsort(self.members_entity_id)
+            self._compute_members_order()
         return self._ordered_members_map
 
+    def _compute_members_order(self):
+        """
+        Compute together the ordered members map and the position of each person in its entity, without looping over persons.
+
+        The map is a stable argsort of the memberships: persons are grouped by entity, and keep their relative order within each entity. The position of a person is then its index in the sorted array, minus the index at which its entity starts.
+        """
+        members_entity_id = self.members_entity_id
+        ordered_members_map = numpy.argsort(members_entity_id, kind = 'stable')
+
+        if self._members_position is None:
+            sorted_entity_id = members_entity_id[ordered_members_map]
+            nb_persons_per_entity = numpy.bincount(members_entity_id)
+            entity_start = numpy.cumsum(nb_persons_per_entity) - nb_persons_per_entity
+            members_position = numpy.empty_like(members_entity_id)
+            members_position[ordered_members_map] = numpy.arange(len(members_entity_id)) - entity_start[sorted_entity_id]
+            self._members_position = members_position
+
+        if self._ordered_members_map is None:
+            self._ordered_members_map = ordered_members_map
+
     def get_role(self, role_name):
         return next((role for role in self.entity.flattened_roles if role.key == role_name), None)
 
@@ -101,7 +190,7 @@ class GroupPopulation(Population):
         self.entity.check_role_validity(role)
         self.members.check_array_compatible_with_entity(array)
         if role is not None:
-            role_filter = self.members.has_role(role)
+            role_filter = self.members._get_role_mask(role)
             return numpy.bincount(
                 self.members_entity_id[role_filter],
                 weights = array[role_filter],
@@ -131,15 +220,29 @@ class GroupPopulation(Population):
     def reduce(self, array, reducer, neutral_element, role = None):
         self.members.check_array_compatible_with_entity(array)
         self.entity.check_role_validity(role)
-        position_in_entity = self.members_position
-        role_filter = self.members.has_role(role) if role is not None else True
+        role_filter = self.members._get_role_mask(role) if role is not None else True
         filtered_array = numpy.where(role_filter, array, neutral_element)
 
         result = self.filled_array(neutral_element)  # Neutral value that will be returned if no one with the given role exists.
 
+        if not isinstance(reducer, numpy.ufunc):
+            return self._reduce_by_position(filtered_array, reducer, neutral_element, result)
+
+        # Sort the persons by entity, and reduce each entity's segment in a single pass
+        # Entities without members are skipped, as reduceat would return the value of the next segment for them
+        nb_persons_per_entity = numpy.bincount(self.members_entity_id, minlength = self.count)
+        entity_start = numpy.cumsum(nb_persons_per_entity) - nb_persons_per_entity
+        non_empty = nb_persons_per_entity > 0
+        if non_empty.any():
+            sorted_array = filtered_array[self.ordered_members_map]
+            result[non_empty] = reducer.reduceat(sorted_array, entity_start[non_empty])
+
+        return result
+
+    def _reduce_by_position(self, filtered_array, reducer, neutral_element, result):
         # We loop over the positions in the entity
         # Looping over the entities is tempting, but potentielly slow if there are a lot of entities
-        biggest_entity_size = numpy.max(position_in_entity) + 1
+        biggest_entity_size = numpy.max(self.members_position) + 1
 
         for p in range(biggest_entity_size):
             values = self.value_nth_person(p, filtered_array, default = neutral_element)
@@ -208,11 +311,7 @@ class GroupPopulation(Population):
             If ``role`` is provided, only the entity member with the given role are taken into account.
         """
         if role:
-            if role.subroles:
-                role_condition = numpy.logical_or.reduce([self.members_role == subrole for subrole in role.subroles])
-            else:
-                role_condition = self.members_role == role
-            return self.sum(role_condition)
+            return self.sum(self.get_role_mask(role))
         else:
             return numpy.bincount(self.members_entity_id)
 
@@ -240,7 +339,7 @@ class GroupPopulation(Population):
         result = self.filled_array(default, dtype = array.dtype)
         if isinstance(array, EnumArray):
             result = EnumArray(result, array.possible_values)
-        role_filter = self.members.has_role(role)
+        role_filter = self.members._get_role_mask(role)
         entity_filter = self.any(role_filter)
 
         result[entity_filter] = array[members_map][role_filter[members_map]]
@@ -281,5 +380,5 @@ class GroupPopulation(Population):
         if role is None:
             return array[self.members_entity_id]
         else:
-            role_condition = self.members.has_role(role)
+            role_condition = self.members._get_role_mask(role)
             return numpy.where(role_condition, array[self.members_entity_id], 0)
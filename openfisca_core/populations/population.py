@@ -15,15 +15,36 @@ class Population:
         self._holders = {}
         self.count = 0
         self.ids = []
+        self._ids_index = None  # (ids, id -> index dict), built on the first lookup
 
     def clone(self, simulation):
         result = Population(self.entity)
         result.simulation = simulation
-        result._holders = {variable: holder.clone(result) for (variable, holder) in self._holders.items()}
+        result._holders = self._clone_holders(result)
         result.count = self.count
         result.ids = self.ids
         return result
 
+    def _clone_holders(self, population):
+        # The variables of the new simulation may have been replaced or removed, for instance by a reform
+        tax_benefit_system = population.simulation.tax_benefit_system
+        holders = {}
+        for variable_name, holder in self._holders.items():
+            variable = tax_benefit_system.get_variable(variable_name)
+            if variable is not None:
+                holders[variable_name] = holder.clone(population, variable)
+        return holders
+
+    def get_subset(self, rows):
+        """
+        Build a population made of the individuals at ``rows`` only, without any value.
+        """
+        result = Population(self.entity)
+        ids = numpy.asarray(self.ids)[rows]
+        result.ids = ids.tolist() if isinstance(self.ids, list) else ids
+        result.count = len(rows)
+        return result
+
     def empty_array(self):
         return numpy.zeros(self.count)
 
@@ -37,7 +58,20 @@ class Population:
         return projector
 
     def get_index(self, id):
-        return self.ids.index(id)
+        """
+        Get the index of the individual ``id``. ``ids`` may be a list or a numpy array.
+        """
+        ids_index = self._ids_index
+        if ids_index is None or ids_index[0] is not self.ids:
+            ids = self.ids.tolist() if isinstance(self.ids, numpy.ndarray) else self.ids
+            index = {}
+            for position, item in enumerate(ids):
+                index.setdefault(item, position)  # As list.index, return the first position of a duplicate id
+            ids_index = self._ids_index = (self.ids, index)
+        try:
+            return ids_index[1][id]
+        except KeyError:
+            raise ValueError("{!r} is not an id of the {} population.".format(id, self.entity.key))
 
     # Calculations
 
@@ -121,12 +155,13 @@ See more information at <https://openfisca.org/doc/coding-the-legislation/35_per
             >>> person.has_role(Household.CHILD)
             >>> array([False])
         """
+        return self._get_role_mask(role).copy()
+
+    def _get_role_mask(self, role):
+        # Cached, read-only version of has_role, for the aggregations that do not modify the mask
         self.entity.check_role_validity(role)
         group_population = self.simulation.get_population(role.entity.plural)
-        if role.subroles:
-            return numpy.logical_or.reduce([group_population.members_role == subrole for subrole in role.subroles])
-        else:
-            return group_population.members_role == role
+        return group_population.get_role_mask(role)
 
     @projectors.projectable
     def value_from_partner(self, array, entity, role):
@@ -1,7 +1,7 @@
 import copy
 
 from openfisca_core.parameters import ParameterNode
-from openfisca_core.taxbenefitsystems import TaxBenefitSystem
+from openfisca_core.taxbenefitsystems import ParametersAtInstantCache, TaxBenefitSystem
 
 
 class Reform(TaxBenefitSystem):
@@ -80,4 +80,5 @@ class Reform(TaxBenefitSystem):
                 .format(modifier_function.__name__, modifier_function.__module__,)
                 )
         self.parameters = reform_parameters
-        self._parameters_at_instant_cache = {}
+        # The reform parameters now differ from the baseline ones, so the baseline cache can't be shared anymore
+        self._parameters_at_instant_cache = ParametersAtInstantCache(self._parameters_at_instant_cache.max_size)
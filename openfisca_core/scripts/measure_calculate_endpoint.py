@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measure how long the /calculate endpoint of the Web API takes to answer a batch request for a large population.
+
+Usage example:
+
+    python openfisca_core/scripts/measure_calculate_endpoint.py --count 10000
+"""
+# flake8: noqa T001
+
+import argparse
+import json
+import time
+from contextlib import contextmanager
+
+from openfisca_country_template import CountryTaxBenefitSystem
+from openfisca_web_api.app import create_app
+
+
+@contextmanager
+def measure_time(title):
+    t1 = time.time()
+    yield
+    t2 = time.time()
+    print('{}\t: {:.4f}s'.format(title, t2 - t1))
+
+
+def build_payload(count):
+    # Couples living in a house, whose taxes and benefits are requested
+    persons = {
+        'person_{}'.format(index): {
+            'salary': {'2017-01': 1000 + index % 4000},
+            'income_tax': {'2017-01': None},
+            'basic_income': {'2017-01': None},
+            }
+        for index in range(count)
+        }
+    households = {
+        'household_{}'.format(index): {
+            'parents': ['person_{}'.format(2 * index), 'person_{}'.format(2 * index + 1)][:count - 2 * index],
+            'rent': {'2017-01': 800},
+            'housing_tax': {'2017': None},
+            'total_taxes': {'2017-01': None},
+            }
+        for index in range((count + 1) // 2)
+        }
+    return json.dumps({'persons': persons, 'households': households})
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument('--count', type = int, default = 10000, help = "Number of persons")
+    parser.add_argument('--repeat', type = int, default = 3, help = "Number of requests to send")
+    args = parser.parse_args()
+
+    client = create_app(CountryTaxBenefitSystem()).test_client()
+    payload = build_payload(args.count)
+    print('Payload\t: {:.1f} MB'.format(len(payload) / 1e6))
+
+    for _ in range(args.repeat):
+        with measure_time('/calculate'):
+            response = client.post('/calculate', data = payload, content_type = 'application/json')
+            response.get_data()
+        assert response.status_code == 200, response.get_data(as_text = True)
+
+
+if __name__ == '__main__':
+    main()
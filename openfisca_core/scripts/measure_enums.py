@@ -0,0 +1,68 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# flake8: noqa T001
+
+
+"""
+Measure the time taken to encode and decode enum arrays, for enums of several sizes, and compare it with the former implementation based on numpy.select.
+"""
+from contextlib import contextmanager
+import argparse
+import time
+
+import numpy as np
+
+from openfisca_core.indexed_enums import ENUM_ARRAY_DTYPE, Enum
+
+
+args = None
+
+
+@contextmanager
+def measure_time(title):
+    t1 = time.time()
+    yield
+    t2 = time.time()
+    print('{}\t: {:.4f} seconds elapsed'.format(title, t2 - t1))
+
+
+def select_encode(enum, array):
+    # Former implementation, with one condition per enum item
+    return np.select([array == item.name for item in enum], [item.index for item in enum]).astype(ENUM_ARRAY_DTYPE)
+
+
+def select_decode_to_str(enum_array):
+    # Former implementation, with one condition per enum item
+    enum = enum_array.possible_values
+    return np.select([enum_array == item.index for item in enum], [item.name for item in enum])
+
+
+def build_enum(nb_items):
+    return Enum('Enum{}'.format(nb_items), ['item_{}'.format(index) for index in range(nb_items)])
+
+
+def main():
+    for nb_items in args.nb_items:
+        enum = build_enum(nb_items)
+        names = np.array([item.name for item in enum])
+        array = names[np.random.randint(nb_items, size = args.size)]
+        print('{} items, {} values'.format(nb_items, args.size))
+
+        with measure_time('encode'):
+            enum_array = enum.encode(array)
+        with measure_time('encode (numpy.select)'):
+            select_encode(enum, array)
+        with measure_time('decode_to_str'):
+            enum_array.decode_to_str()
+        with measure_time('decode_to_str (numpy.select)'):
+            select_decode_to_str(enum_array)
+        with measure_time('decode'):
+            enum_array.decode()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument('--nb-items', type = int, nargs = '+', default = [3, 30, 300], help = "numbers of items of the enums to measure")
+    parser.add_argument('--size', type = int, default = 1000000, help = "size of the arrays to encode and decode")
+    args = parser.parse_args()
+    main()
@@ -0,0 +1,81 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+# flake8: noqa T001
+
+
+"""
+Measure the time taken by the structural computations of group populations (positions of persons in their entity, ordering of members) and by their aggregations on large random populations.
+"""
+from contextlib import contextmanager
+import argparse
+import time
+
+import numpy as np
+
+from openfisca_core.entities import build_entity
+from openfisca_core.populations import GroupPopulation, Population
+
+
+args = None
+
+
+@contextmanager
+def measure_time(title):
+    t1 = time.time()
+    yield
+    t2 = time.time()
+    print('{}\t: {:.4f} seconds elapsed'.format(title, t2 - t1))
+
+
+def loop_members_position(members_entity_id):
+    # Former implementation, looping in Python over every person
+    nb_entities = np.max(members_entity_id) + 1
+    members_position = np.empty_like(members_entity_id)
+    counter_by_entity = np.zeros(nb_entities)
+    for k in range(len(members_entity_id)):
+        entity_index = members_entity_id[k]
+        members_position[k] = counter_by_entity[entity_index]
+        counter_by_entity[entity_index] += 1
+    return members_position
+
+
+def build_population(nb_persons):
+    household = build_entity(
+        key = "household",
+        plural = "households",
+        label = "Household",
+        roles = [{'key': 'member', 'plural': 'members'}],
+        )
+    person = build_entity(key = "person", plural = "persons", label = "Person", is_person = True)
+    persons = Population(person)
+    persons.count = nb_persons
+    population = GroupPopulation(household, persons)
+    # Households of 1 to 6 persons, whose members are shuffled in the persons vector
+    nb_households = nb_persons // 3
+    population.members_entity_id = np.random.randint(nb_households, size = nb_persons)
+    population.count = nb_households
+    return population
+
+
+def main():
+    for nb_persons in args.nb_persons:
+        population = build_population(nb_persons)
+        print('{} persons'.format(nb_persons))
+        with measure_time('members_position'):
+            population.members_position
+        if args.loop:
+            with measure_time('members_position (python loop)'):
+                loop_members_position(population.members_entity_id)
+        values = np.random.rand(nb_persons)
+        with measure_time('max'):
+            population.max(values)
+        with measure_time('max (by position)'):
+            population._reduce_by_position(values, lambda x, y: np.maximum(x, y), - np.inf, population.filled_array(- np.inf))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument('--nb-persons', type = int, nargs = '+', default = [1000000, 10000000], help = "numbers of persons to measure")
+    parser.add_argument('--loop', action = 'store_true', default = False, help = "also measure the former Python loop implementation")
+    args = parser.parse_args()
+    main()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measure how the calculation of a large population scales with the number of worker processes of a ParallelRunner.
+
+Usage example:
+
+    python openfisca_core/scripts/measure_parallel_runner.py --count 1000000 --workers 1 2 4 8
+"""
+# flake8: noqa T001
+
+import argparse
+import time
+from contextlib import contextmanager
+
+import numpy
+
+from openfisca_core.simulations import ParallelRunner
+from openfisca_country_template import CountryTaxBenefitSystem
+
+
+@contextmanager
+def measure_time(title):
+    t1 = time.time()
+    yield
+    t2 = time.time()
+    print('{}\t: {:.4f}s'.format(title, t2 - t1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument('--count', type = int, default = 1000000, help = "Number of persons")
+    parser.add_argument('--workers', type = int, nargs = '+', default = [1, 2, 4], help = "Numbers of worker processes to try")
+    args = parser.parse_args()
+
+    tax_benefit_system = CountryTaxBenefitSystem()
+    random = numpy.random.RandomState(0)
+    members_entity_id = numpy.arange(args.count) // 2
+    households_ids = numpy.arange(members_entity_id[-1] + 1)
+    members_role = numpy.where(numpy.arange(args.count) % 2 == 0, 0, 2)
+    inputs = {'salary': {'2017-01': random.randint(0, 5000, size = args.count).astype(numpy.float32)}}
+    requests = [('disposable_income', '2017-01'), ('total_taxes', '2017-01')]
+
+    for workers in args.workers:
+        runner = ParallelRunner(tax_benefit_system, numpy.arange(args.count), {'household': (households_ids, members_entity_id, members_role)}, inputs, max_workers = workers)
+        with measure_time('{} workers'.format(workers)):
+            runner.run(requests)
+
+
+if __name__ == '__main__':
+    main()
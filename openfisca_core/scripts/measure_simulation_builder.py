@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measure how long SimulationBuilder takes to build simulations from situations of growing size, or with axes of growing size, to check that it scales linearly with the number of persons.
+
+Usage example:
+
+    python openfisca_core/scripts/measure_simulation_builder.py --count 40000
+    python openfisca_core/scripts/measure_simulation_builder.py --count 100000 --axes
+"""
+# flake8: noqa T001
+
+import argparse
+import time
+
+from openfisca_country_template import CountryTaxBenefitSystem
+from openfisca_core.simulation_builder import SimulationBuilder
+
+
+def build_situation(count):
+    # Households of a parent and a child
+    persons = {'p{}'.format(index): {'salary': {'2017-01': index}} for index in range(count)}
+    households = {
+        'h{}'.format(index): {'parents': ['p{}'.format(2 * index + 1)], 'children': ['p{}'.format(2 * index)], 'rent': {'2017-01': index}}
+        for index in range(count // 2)
+        }
+    return {'persons': persons, 'households': households}
+
+
+def build_situation_with_axes(count):
+    # A parent and a child, whose household is repeated along an axis
+    return {
+        'persons': {'Alicia': {}, 'Javier': {}},
+        'households': {'housea': {'parents': ['Alicia'], 'children': ['Javier']}},
+        'axes': [[{'count': count // 2, 'name': 'salary', 'min': 0, 'max': count, 'period': '2018-11'}]],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description = __doc__)
+    parser.add_argument('--count', type = int, default = 40000, help = "Number of persons of the smallest situation")
+    parser.add_argument('--steps', type = int, default = 3, help = "Number of times the number of persons is doubled")
+    parser.add_argument('--axes', action = 'store_true', help = "Build the persons by expanding an axis, instead of listing them in the situation")
+    args = parser.parse_args()
+
+    tax_benefit_system = CountryTaxBenefitSystem()
+    previous_duration = None
+    for step in range(args.steps + 1):
+        count = args.count * 2 ** step
+        situation = build_situation_with_axes(count) if args.axes else build_situation(count)
+        start = time.time()
+        SimulationBuilder().build_from_entities(tax_benefit_system, situation)
+        duration = time.time() - start
+        ratio = '' if previous_duration is None else '\t(x{:.2f})'.format(duration / previous_duration)
+        print('{} persons\t: {:.4f}s{}'.format(count, duration, ratio))
+        previous_duration = duration
+
+
+if __name__ == '__main__':
+    main()
@@ -25,4 +25,7 @@ from openfisca_core.errors import CycleError, NaNCreationError, SpiralError  # n
 
 from .helpers import calculate_output_add, calculate_output_divide, check_type, transform_to_strict_syntax  # noqa: F401
 from .simulation import Simulation  # noqa: F401
+from .execution_planner import ExecutionPlanner  # noqa: F401
 from .simulation_builder import SimulationBuilder  # noqa: F401
+from .chunked_runner import ChunkedRunner  # noqa: F401
+from .parallel_runner import ParallelRunner  # noqa: F401
@@ -0,0 +1,170 @@
+import os
+import tempfile
+
+import numpy
+
+from openfisca_core import periods
+from openfisca_core.indexed_enums import Enum, EnumArray
+from openfisca_core.simulations.simulation_builder import SimulationBuilder
+
+
+class ChunkedRunner:
+    """
+    Runs a simulation on a population too large for all its intermediate values to fit in memory, one chunk of persons at a time.
+
+    Persons are partitioned so that the members of a group entity are always in the same chunk: a person is never calculated apart from their household. Group entities without members are calculated with the last chunk. Each chunk is a :any:`Simulation` of its own, built with a :any:`SimulationBuilder`, which is freed once its results are written to disk. The peak memory is thus bounded by the size of a chunk, and by the inputs.
+
+    The results are the same as those of a single simulation of the whole population, as long as formulas don't compare entities of different groups (for instance, with a rank over the whole population).
+
+    :param tax_benefit_system: The tax and benefit system to run
+    :param persons_ids: The ids of the persons
+    :param groups: For each group entity key, a tuple ``(ids, members_entity_id, members_role)``: the ids of the entities, the index in ``ids`` of the entity of each person, and the role of each person, as a role key or index. Group entities left out get one entity per person.
+    :param inputs: For each variable name, a dict mapping periods to the values of the whole population of the variable entity. Memory-mapped arrays can be used, so that the inputs don't have to fit in memory either.
+    :param chunk_size: The maximal number of persons of a chunk. Entities with more members than that make a chunk of their own.
+    :param memory_config: If given, the :any:`MemoryConfig` of the simulation of each chunk
+
+    Example:
+
+    >>> runner = ChunkedRunner(tax_benefit_system, persons_ids, {'household': (households_ids, members_entity_id, members_role)}, {'salary': {'2017-01': salaries}}, chunk_size = 100000)
+    >>> runner.run([('income_tax', '2017-01')], output_dir)
+    >>> {('income_tax', '2017-01'): memmap([150., ...])}
+    """
+
+    def __init__(self, tax_benefit_system, persons_ids, groups, inputs, chunk_size, memory_config = None):
+        if chunk_size < 1:
+            raise ValueError("The chunk size must be a positive number of persons, not {}.".format(chunk_size))
+
+        self.tax_benefit_system = tax_benefit_system
+        self.persons_ids = numpy.asarray(persons_ids)
+        self.inputs = inputs
+        self.chunk_size = chunk_size
+        self.memory_config = memory_config
+
+        nb_persons = len(self.persons_ids)
+        self.groups = {}
+        for entity in tax_benefit_system.group_entities:
+            if entity.key in groups:
+                ids, members_entity_id, members_role = groups[entity.key]
+                self.groups[entity.key] = (numpy.asarray(ids), numpy.asarray(members_entity_id), numpy.asarray(members_role))
+            else:
+                self.groups[entity.key] = (self.persons_ids, numpy.arange(nb_persons), numpy.zeros(nb_persons, dtype = numpy.int32))
+
+        # Group entities without members belong to no chunk of persons
+        self._memberless_rows = {
+            entity_key: numpy.setdiff1d(numpy.arange(len(ids)), members_entity_id)
+            for entity_key, (ids, members_entity_id, _members_role) in self.groups.items()
+            }
+
+    def get_chunks(self):
+        """
+        Partition the persons along the boundaries of all group entities.
+
+        :returns: A list of sorted arrays of person indices, one per chunk
+        """
+        # Label each person with the smallest index of the persons they are linked to through any group entity, until the labels are stable
+        nb_persons = len(self.persons_ids)
+        labels = numpy.arange(nb_persons)
+        while True:
+            previous_labels = labels
+            for ids, members_entity_id, _members_role in self.groups.values():
+                group_labels = numpy.full(len(ids), nb_persons)
+                numpy.minimum.at(group_labels, members_entity_id, labels)
+                labels = numpy.minimum(labels, group_labels[members_entity_id])
+            if numpy.array_equal(labels, previous_labels):
+                break
+
+        order = numpy.argsort(labels, kind = 'stable')
+        sorted_labels = labels[order]
+        component_starts = numpy.flatnonzero(numpy.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+        component_ends = numpy.r_[component_starts[1:], nb_persons]
+
+        chunks = []
+        chunk_start = 0
+        for start, end in zip(component_starts, component_ends):
+            if end - chunk_start > self.chunk_size and start > chunk_start:
+                chunks.append(numpy.sort(order[chunk_start:start]))
+                chunk_start = start
+        if chunk_start < nb_persons:
+            chunks.append(numpy.sort(order[chunk_start:]))
+        return chunks
+
+    def run(self, requests, output_dir = None):
+        """
+        Calculate ``requests``, a list of ``(variable_name, period)`` pairs, chunk by chunk.
+
+        The results of each request are written in a ``.npy`` file of ``output_dir``, a temporary directory by default.
+
+        :returns: A dict mapping each request to its results for the whole population, memory-mapped from ``output_dir``
+        """
+        requests = list(dict.fromkeys(requests))
+        if output_dir is None:
+            output_dir = tempfile.mkdtemp(prefix = 'openfisca_')
+        outputs = {}
+
+        chunks = self.get_chunks()
+        for index, rows in enumerate(chunks):
+            simulation, entities_rows = self._build_chunk_simulation(rows, with_memberless_entities = index == len(chunks) - 1)
+            results = simulation.calculate_many(requests)
+
+            for request in requests:
+                result = results[request]
+                entity = simulation.get_variable_population(request[0]).entity
+                if request not in outputs:
+                    outputs[request] = self._open_output(output_dir, request, entity, result)
+                outputs[request][entities_rows[entity.key]] = result.view(numpy.ndarray)
+
+            # Free the chunk before building the next one
+            del simulation, results
+
+        for output in outputs.values():
+            output.flush()
+        return {request: self._load_output(output, request) for request, output in outputs.items()}
+
+    def _build_chunk_simulation(self, rows, with_memberless_entities = False):
+        builder = SimulationBuilder()
+        builder.create_entities(self.tax_benefit_system)
+        person_entity = self.tax_benefit_system.person_entity
+        builder.declare_person_entity(person_entity.key, self.persons_ids[rows])
+        entities_rows = {person_entity.key: rows}
+
+        for entity_key, (ids, members_entity_id, members_role) in self.groups.items():
+            members_entity_id = members_entity_id[rows]
+            entity_rows = numpy.unique(members_entity_id)
+            if with_memberless_entities:
+                entity_rows = numpy.concatenate([entity_rows, self._memberless_rows[entity_key]])
+            population = builder.declare_entity(entity_key, ids[entity_rows])
+            builder.join_with_persons(population, ids[members_entity_id], members_role[rows])
+            entities_rows[entity_key] = entity_rows
+
+        simulation = builder.build(self.tax_benefit_system)
+        if self.memory_config is not None:
+            simulation.memory_config = self.memory_config
+
+        for variable_name, values in self.inputs.items():
+            entity_rows = entities_rows[simulation.get_variable_population(variable_name).entity.key]
+            for period, value in values.items():
+                simulation.set_input(variable_name, period, numpy.asarray(value[entity_rows]))
+
+        return simulation, entities_rows
+
+    def _get_count(self, entity):
+        if entity.is_person:
+            return len(self.persons_ids)
+        return len(self.groups[entity.key][0])
+
+    def _open_output(self, output_dir, request, entity, result):
+        variable_name, period = request
+        filename = '{}_{}.npy'.format(variable_name, periods.period(period) if period is not None else 'eternity')
+        return numpy.lib.format.open_memmap(
+            os.path.join(output_dir, filename),
+            mode = 'w+',
+            dtype = result.dtype,
+            shape = (self._get_count(entity),),
+            )
+
+    def _load_output(self, output, request):
+        output = numpy.load(output.filename, mmap_mode = 'r')
+        variable = self.tax_benefit_system.get_variable(request[0], check_existence = True)
+        if variable.value_type == Enum:
+            return EnumArray(output, variable.possible_values)
+        return output
@@ -0,0 +1,158 @@
+from openfisca_core import periods
+from openfisca_core.periods import Period
+from openfisca_core.tracers import SimpleTracer
+
+
+class ExecutionPlanner:
+    """
+    Plans the evaluation of variables of a :any:`TaxBenefitSystem`, so that simulations can run their calculations iteratively instead of recursively.
+
+    The first time a set of variables is requested, the planner records the ``(variable, period)`` dependencies visited by the calculation, in the order in which they are completed. This order is a topological order of the dependency graph: every dependency comes before the calculations that need it.
+
+    Plans are cached by "period shape": the periods of a plan are stored relative to the period of the first request, so that a plan recorded for ``2017-01`` is reused for ``2018-01``. Formulas derive periods from calendar units (``period.this_year``, ``period.first_month``…), so a plan is only reused for periods starting on the same month of the year and day of the month: a plan recorded for ``2017-01`` is not reused for ``2018-06``.
+
+    A plan is only a scheduling hint. Each step is still computed by :any:`Simulation.calculate`, so any dependency that the plan misses (for instance because a formula depends on the data) is calculated recursively as usual. Calculations involved in a spiral are left out of plans, so that spirals are resolved exactly as without a planner.
+
+    Example:
+
+    >>> planner = ExecutionPlanner(tax_benefit_system)
+    >>> planner.calculate_many(simulation, [('disposable_income', '2017-01')])
+    >>> {('disposable_income', '2017-01'): array([2000.])}
+    """
+
+    def __init__(self, tax_benefit_system):
+        self.tax_benefit_system = tax_benefit_system
+        self._plans = {}
+
+    def calculate_many(self, simulation, requests):
+        """
+        Calculate ``requests``, a list of ``(variable_name, period)`` pairs, following a cached plan if there is one, and recording it otherwise.
+
+        :returns: The same dict as :any:`Simulation.calculate_many`
+        """
+        if simulation.tax_benefit_system is not self.tax_benefit_system:
+            raise ValueError("This execution planner was created for another tax and benefit system.")
+
+        requests = list(requests)
+        if not requests or simulation.trace:
+            # Tracing simulations are not planned, so that the calculation tree they record stays complete
+            return simulation.calculate_many(requests)
+
+        reference_period, key = self._get_plan_key(requests)
+        plan = self._plans.get(key)
+
+        if plan is None:
+            results, plan = self._record_plan(simulation, requests, reference_period)
+            self._plans[key] = plan
+            return results
+
+        simulation.calculate_many(
+            (variable_name, _resolve_period(relative_period, reference_period))
+            for variable_name, relative_period in plan
+            )
+        return simulation.calculate_many(requests)
+
+    def get_plan(self, requests):
+        """
+        Get the cached plan for ``requests``, as a list of ``(variable_name, period)`` pairs, or ``None`` if it has not been recorded yet.
+        """
+        requests = list(requests)
+        if not requests:
+            return None
+        reference_period, key = self._get_plan_key(requests)
+        plan = self._plans.get(key)
+        if plan is None:
+            return None
+        return [
+            (variable_name, _resolve_period(relative_period, reference_period))
+            for variable_name, relative_period in plan
+            ]
+
+    def clear(self):
+        self._plans = {}
+
+    def _get_plan_key(self, requests):
+        parsed_requests = [
+            (variable_name, periods.period(period) if period is not None and not isinstance(period, Period) else period)
+            for variable_name, period in requests
+            ]
+        reference_period = next(iter(
+            period for _variable_name, period in parsed_requests
+            if _is_relative(period)
+            ), None)
+        # Periods derived from calendar units only have the same offsets from periods with the same alignment
+        alignment = None if reference_period is None else (reference_period.start.month, reference_period.start.day)
+        key = (alignment, tuple(
+            (variable_name, _relativise_period(period, reference_period))
+            for variable_name, period in parsed_requests
+            ))
+        return reference_period, key
+
+    def _record_plan(self, simulation, requests, reference_period):
+        tracer = simulation.tracer
+        recorder = DependencyRecorder()
+        simulation.tracer = recorder
+        try:
+            results = simulation.calculate_many(requests)
+        finally:
+            simulation.tracer = tracer
+
+        plan = [
+            (variable_name, _relativise_period(period, reference_period))
+            for variable_name, period in recorder.completed
+            if (variable_name, period) not in recorder.spiral_members
+            ]
+        return results, plan
+
+
+class DependencyRecorder(SimpleTracer):
+    """
+    Tracer recording the calculations in the order in which they are completed, and the calculations involved in a spiral.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.completed = []
+        self.spiral_members = set()
+        self._seen = set()
+
+    def record_calculation_start(self, variable: str, period):
+        if self.get_nb_frames(variable):
+            # Every frame from the previous occurrence of the variable belongs to the spiral
+            names = [frame['name'] for frame in self.stack]
+            first_occurrence = names.index(variable)
+            self.spiral_members.update((frame['name'], frame['period']) for frame in self.stack[first_occurrence:])
+            self.spiral_members.add((variable, period))
+        super().record_calculation_start(variable, period)
+
+    def record_calculation_end(self):
+        frame = self.stack[-1]
+        super().record_calculation_end()
+        calculation = (frame['name'], frame['period'])
+        if calculation not in self._seen:
+            self._seen.add(calculation)
+            self.completed.append(calculation)
+
+
+def _is_relative(period):
+    return period is not None and period.unit != periods.ETERNITY
+
+
+def _relativise_period(period, reference_period):
+    """
+    Express ``period`` as an offset from ``reference_period``, in months and days between their starts.
+    """
+    if reference_period is None or not _is_relative(period):
+        return period
+    start, reference_start = period.start, reference_period.start
+    months = (start.year - reference_start.year) * 12 + start.month - reference_start.month
+    days = start.day - reference_start.day
+    return (period.unit, period.size, months, days)
+
+
+def _resolve_period(relative_period, reference_period):
+    if not isinstance(relative_period, tuple) or isinstance(relative_period, Period):
+        return relative_period
+    unit, size, months, days = relative_period
+    start = reference_period.start.offset(months, periods.MONTH).offset(days, periods.DAY)
+    return Period((unit, start, size))
@@ -1,3 +1,7 @@
+import os
+
+import numpy
+
 from openfisca_core.errors import SituationParsingError
 
 
@@ -24,6 +28,61 @@ def check_type(input, input_type, path = None):
             "Invalid type: must be of type '{}'.".format(json_type_map[input_type]))
 
 
+def index_ids(ids, count):
+    """
+    Repeat ``ids`` up to ``count`` items, suffixing each item with its index.
+
+    The characters of the new ids are written directly into a numpy array, instead of concatenating ``count`` strings.
+
+    Example:
+
+    >>> index_ids(['Alicia', 'Javier'], 4)
+    >>> array(['Alicia0', 'Javier1', 'Alicia2', 'Javier3'], dtype='<U7')
+    """
+    ids = [str(id) for id in ids]
+    indices = numpy.arange(count)
+    prefixes_lengths = numpy.array([len(id) for id in ids])
+    nb_digits = len(str(max(count - 1, 0)))
+    width = prefixes_lengths.max() + nb_digits
+
+    # Code points of the characters of each new id, padded with zeros
+    codes = numpy.zeros((count, width), dtype = numpy.uint32)
+    for position, id in enumerate(ids):
+        codes[position::len(ids), :len(id)] = numpy.array(id).reshape(1).view(numpy.uint32)
+
+    # Indices with the same number of digits are contiguous
+    suffixes_starts = prefixes_lengths[indices % len(ids)]
+    for digits in range(1, nb_digits + 1):
+        start, stop = (10 ** (digits - 1) if digits > 1 else 0), min(10 ** digits, count)
+        rows = indices[start:stop, None]
+        columns = suffixes_starts[start:stop, None] + numpy.arange(digits)
+        codes[rows, columns] = rows // 10 ** numpy.arange(digits - 1, -1, -1) % 10 + ord('0')
+
+    return codes.view('<U{}'.format(width)).ravel()
+
+
+def read_columns(table):
+    """
+    Read the columns of ``table`` as numpy arrays, without copying them when possible.
+
+    ``table`` can be a dict of arrays, a pandas ``DataFrame``, a pyarrow ``Table`` (for instance read from a Parquet file with ``pyarrow.parquet.read_table``), or the path to a ``.npz`` file.
+
+    :returns: A dict mapping column names to arrays
+    """
+    if isinstance(table, (str, os.PathLike)):
+        if not str(table).endswith('.npz'):
+            raise ValueError("Can't read table '{}': only .npz files can be read. Read other files with a library such as pandas or pyarrow.".format(table))
+        with numpy.load(table) as npz_file:
+            return {name: npz_file[name] for name in npz_file.files}
+    if isinstance(table, dict):
+        return {name: numpy.asarray(column) for name, column in table.items()}
+    if hasattr(table, 'column_names'):  # pyarrow Table
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+    if hasattr(table, 'columns'):  # pandas DataFrame
+        return {str(name): table[name].to_numpy() for name in table.columns}
+    raise TypeError("Can't read table of type {}: expected a dict of arrays, a DataFrame, a pyarrow Table, or the path to a .npz file.".format(type(table).__name__))
+
+
 def transform_to_strict_syntax(data):
     if isinstance(data, (str, int)):
         data = [data]
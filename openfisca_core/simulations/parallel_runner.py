@@ -0,0 +1,168 @@
+import concurrent.futures
+import math
+import multiprocessing
+import os
+import typing
+
+import numpy
+
+from openfisca_core.data_storage.shared_arrays import SharedArrays
+from openfisca_core.indexed_enums import Enum, EnumArray
+from openfisca_core.simulations.chunked_runner import ChunkedRunner
+
+
+class ParallelRunner(ChunkedRunner):
+    """
+    Runs a simulation on several cores, by calculating shards of the population in a pool of processes.
+
+    The population is split in shards along the boundaries of group entities, as by a :any:`ChunkedRunner`. Each worker process receives the tax and benefit system once, when it starts, and then builds and calculates a :any:`Simulation` per shard.
+
+    The inputs and the results travel through :any:`SharedArrays`, so that neither is pickled: a shard is sent to a worker as the indices of its persons. Only inputs and results of ``object`` dtype, for instance strings, are pickled.
+
+    Workers are forked where the platform allows it, so that they inherit the tax and benefit system. With other start methods, given as ``mp_context``, the tax and benefit system must be picklable.
+
+    :param max_workers: The number of worker processes. Defaults to the number of CPUs.
+    :param chunk_size: The maximal number of persons of a shard. Defaults to an even split of the population between the workers.
+    :param mp_context: The multiprocessing context of the pool of workers
+    :param shared_dir: A directory where inputs and results are shared in memory-mapped files, instead of shared memory blocks. Required before Python 3.8.
+
+    The other parameters are those of :any:`ChunkedRunner`.
+
+    Example:
+
+    >>> runner = ParallelRunner(tax_benefit_system, persons_ids, {'household': (households_ids, members_entity_id, members_role)}, {'salary': {'2017-01': salaries}}, max_workers = 32)
+    >>> runner.run([('income_tax', '2017-01')])
+    >>> {('income_tax', '2017-01'): array([150., ...])}
+    """
+
+    def __init__(self, tax_benefit_system, persons_ids, groups, inputs, max_workers = None, chunk_size = None, memory_config = None, mp_context = None, shared_dir = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        if mp_context is None and 'fork' in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context('fork')
+        self.mp_context = mp_context
+        self.shared_dir = shared_dir
+        if chunk_size is None:
+            chunk_size = max(math.ceil(len(persons_ids) / self.max_workers), 1)
+        super().__init__(tax_benefit_system, persons_ids, groups, inputs, chunk_size, memory_config)
+
+    def run(self, requests):
+        """
+        Calculate ``requests``, a list of ``(variable_name, period)`` pairs, shard by shard in the worker processes.
+
+        :returns: A dict mapping each request to its results for the whole population
+        """
+        requests = list(dict.fromkeys(requests))
+
+        # Arrays of object dtype can't be shared: they are pickled to the workers
+        arrays = {}
+        pickled_inputs = {}
+
+        def add_input(name, array):
+            (pickled_inputs if array.dtype.hasobject else arrays)[name] = array
+            return name
+
+        persons_ids = add_input('persons_ids', self.persons_ids)
+        groups = {
+            entity_key: tuple(
+                add_input('{}/{}'.format(entity_key, field), array)
+                for field, array in zip(('ids', 'members_entity_id', 'members_role'), (ids, members_entity_id, self._encode_roles(entity_key, members_role)))
+                )
+            for entity_key, (ids, members_entity_id, members_role) in self.groups.items()
+            }
+        inputs = {
+            variable_name: {period: add_input('{}/{}'.format(variable_name, period), self._encode_input(variable_name, value)) for period, value in values.items()}
+            for variable_name, values in self.inputs.items()
+            }
+
+        outputs_specs = {}
+        pickled_outputs = {}
+        for index, request in enumerate(requests):
+            variable = self.tax_benefit_system.get_variable(request[0], check_existence = True)
+            count = self._get_count(variable.entity)
+            dtype = numpy.dtype(variable.dtype)
+            if dtype.hasobject:
+                pickled_outputs[request] = numpy.empty(count, dtype = dtype)
+            else:
+                outputs_specs[str(index)] = (dtype, count)
+        outputs_names = {request: str(index) for index, request in enumerate(requests) if str(index) in outputs_specs}
+
+        shared_inputs = SharedArrays.publish(arrays, path = self._get_shared_path('inputs'))
+        try:
+            shared_outputs = SharedArrays.allocate(outputs_specs, path = self._get_shared_path('outputs'))
+            try:
+                state = (self.tax_benefit_system, shared_inputs, pickled_inputs, (persons_ids, groups, inputs), shared_outputs, outputs_names, self.memory_config)
+                with concurrent.futures.ProcessPoolExecutor(self.max_workers, mp_context = self.mp_context, initializer = _init_worker, initargs = (state,)) as executor:
+                    chunks = self.get_chunks()
+                    futures = [executor.submit(_run_shard, rows, requests, index == len(chunks) - 1) for index, rows in enumerate(chunks)]
+                    for future in concurrent.futures.as_completed(futures):
+                        # Results of object dtype are sent back with the task
+                        for request, (entity_rows, result) in future.result().items():
+                            pickled_outputs[request][entity_rows] = result
+
+                results = {}
+                for request in requests:
+                    value = numpy.array(shared_outputs[outputs_names[request]]) if request in outputs_names else pickled_outputs[request]
+                    variable = self.tax_benefit_system.get_variable(request[0])
+                    results[request] = EnumArray(value, variable.possible_values) if variable.value_type == Enum else value
+                return results
+            finally:
+                shared_outputs.unlink()
+        finally:
+            shared_inputs.unlink()
+
+    def _get_shared_path(self, name):
+        if self.shared_dir is None:
+            return None
+        return os.path.join(self.shared_dir, '{}-{}.dat'.format(name, id(self)))
+
+    def _encode_input(self, variable_name, value):
+        variable = self.tax_benefit_system.get_variable(variable_name, check_existence = True)
+        if variable.value_type == Enum:
+            value = variable.possible_values.encode(value)
+        return numpy.asarray(value)
+
+    def _encode_roles(self, entity_key, members_role):
+        if members_role.dtype.kind in {'i', 'u'}:
+            return members_role
+        entity = next(entity for entity in self.tax_benefit_system.group_entities if entity.key == entity_key)
+        flattened_roles = entity.flattened_roles
+        if not flattened_roles:
+            return numpy.zeros(len(members_role), dtype = numpy.int32)
+        return numpy.select([members_role == role.key for role in flattened_roles], range(len(flattened_roles))).astype(numpy.int32)
+
+
+_worker_state: typing.Dict[str, typing.Any] = {}
+
+
+def _init_worker(state):
+    tax_benefit_system, shared_inputs, pickled_inputs, (persons_ids, groups, inputs), shared_outputs, outputs_names, memory_config = state
+
+    def get_input(name):
+        return pickled_inputs[name] if name in pickled_inputs else shared_inputs[name]
+
+    runner = ChunkedRunner(
+        tax_benefit_system,
+        get_input(persons_ids),
+        {entity_key: tuple(get_input(name) for name in names) for entity_key, names in groups.items()},
+        {variable_name: {period: get_input(name) for period, name in names.items()} for variable_name, names in inputs.items()},
+        chunk_size = 1,
+        memory_config = memory_config,
+        )
+    outputs = {request: shared_outputs[name] for request, name in outputs_names.items()}
+    _worker_state.update(runner = runner, outputs = outputs)
+
+
+def _run_shard(rows, requests, with_memberless_entities):
+    runner, outputs = _worker_state['runner'], _worker_state['outputs']
+    simulation, entities_rows = runner._build_chunk_simulation(rows, with_memberless_entities)
+    results = simulation.calculate_many(requests)
+
+    pickled_results = {}
+    for request in requests:
+        entity_rows = entities_rows[simulation.get_variable_population(request[0]).entity.key]
+        result = results[request].view(numpy.ndarray)
+        if request in outputs:
+            outputs[request][entity_rows] = result
+        else:
+            pickled_results[request] = (entity_rows, result)
+    return pickled_results
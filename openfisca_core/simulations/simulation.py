@@ -5,7 +5,9 @@ import numpy
 
 from openfisca_core import commons, periods
 from openfisca_core.errors import CycleError, SpiralError
+from openfisca_core.experimental import CacheManager
 from openfisca_core.indexed_enums import Enum, EnumArray
+from openfisca_core.parameters import ParameterNode
 from openfisca_core.periods import Period
 from openfisca_core.tracers import FullTracer, SimpleTracer, TracingParameterNodeAtInstant
 
@@ -36,6 +38,9 @@ class Simulation:
         self.create_shortcuts()
 
         self.invalidated_caches = set()
+        self._calculations = []  # Calculations in progress, as (variable_name, period) pairs
+        self._dependents = {}  # Calculations which have used each calculated value, by variable name and period
+        self._formula_calculations = set()  # Calculations which values were returned by a formula
 
         self.debug = False
         self.trace = False
@@ -47,6 +52,22 @@ class Simulation:
         self.memory_config = None
         self._data_storage_dir = None
 
+    @property
+    def memory_config(self):
+        return self._memory_config
+
+    @memory_config.setter
+    def memory_config(self, memory_config):
+        self._memory_config = memory_config
+        self._cache_manager = CacheManager(memory_config) if memory_config else None
+
+    @property
+    def cache_manager(self):
+        """
+        :any:`CacheManager` keeping the values cached in memory within the limits of ``memory_config``, if any.
+        """
+        return self._cache_manager
+
     @property
     def trace(self):
         return self._trace
@@ -98,12 +119,65 @@ class Simulation:
             self.tracer.record_calculation_end()
             self.purge_cache_of_invalid_values()
 
+    def calculate_many(self, requests):
+        """
+        Calculate several variables, each for a given period, in a single call.
+
+        ``requests`` is an iterable of ``(variable_name, period)`` pairs. Periods are parsed once per distinct value, duplicate requests are only computed once, and the cache purge that :any:`calculate` runs after each call only happens when some values have actually been invalidated.
+
+        This is a convenience over calling :any:`calculate` in a loop: the dependencies of each request are still resolved recursively, one request after the other. To calculate the dependencies of the requests in a precomputed order, use :any:`ExecutionPlanner`.
+
+        :returns: A dict mapping each requested ``(variable_name, period)`` pair, as given, to its calculated array
+
+        Example:
+
+        >>> simulation.calculate_many([('income_tax', '2017-01'), ('salary', '2017-01')])
+        >>> {('income_tax', '2017-01'): array([150.]), ('salary', '2017-01'): array([1000.])}
+        """
+        results = {}
+        parsed_periods = {}
+
+        for request in requests:
+            if request in results:
+                continue
+
+            variable_name, period = request
+            if period is not None and not isinstance(period, Period):
+                if period not in parsed_periods:
+                    parsed_periods[period] = periods.period(period)
+                period = parsed_periods[period]
+
+            self.tracer.record_calculation_start(variable_name, period)
+
+            try:
+                result = self._calculate(variable_name, period)
+                self.tracer.record_calculation_result(result)
+                results[request] = result
+
+            finally:
+                self.tracer.record_calculation_end()
+                if self.invalidated_caches:
+                    self.purge_cache_of_invalid_values()
+
+        return results
+
     def _calculate(self, variable_name, period: Period):
         """
         Calculate the variable ``variable_name`` for the period ``period``, using the variable formula if it exists.
 
         :returns: A numpy array containing the result of the calculation
         """
+        # Record that the calculation in progress, if any, uses this value
+        if self._calculations:
+            self._dependents.setdefault(variable_name, {}).setdefault(period, set()).add(self._calculations[-1])
+
+        self._calculations.append((variable_name, period))
+        try:
+            return self._calculate_value(variable_name, period)
+        finally:
+            self._calculations.pop()
+
+    def _calculate_value(self, variable_name, period: Period):
         population = self.get_variable_population(variable_name)
         holder = population.get_holder(variable_name)
         variable = self.tax_benefit_system.get_variable(variable_name, check_existence = True)
@@ -134,6 +208,138 @@ class Simulation:
 
         return array
 
+    def invalidate_dependents(self, variable_name, period = None):
+        """
+        Delete the values calculated, directly or not, from the value of ``variable_name`` for ``period``, or for any period if ``period`` is ``None``.
+
+        Values which have not been calculated from it are kept in cache, so that calculating them again only runs the formulas affected by the change.
+
+        This is done automatically by :any:`set_input` and :any:`delete_arrays`.
+        """
+        for name, period in self._get_dependents(variable_name, period):
+            self.get_holder(name).delete_arrays(period)
+
+    def _get_dependents(self, variable_name, period):
+        invalidated = set()
+        to_visit = [(variable_name, period)]
+
+        while to_visit:
+            name, period = to_visit.pop()
+            for dependency_period, dependents in self._dependents.get(name, {}).items():
+                if not _periods_overlap(period, dependency_period):
+                    continue
+                for dependent in dependents:
+                    if dependent not in invalidated:
+                        invalidated.add(dependent)
+                        to_visit.append(dependent)
+
+        return invalidated
+
+    def _forget_dependencies(self, variable_name, period):
+        # The value of variable_name for period is not calculated anymore, so it is not a dependent of other calculations
+        for dependents_by_period in self._dependents.values():
+            for dependents in dependents_by_period.values():
+                for dependent in [
+                        (name, dependent_period) for name, dependent_period in dependents
+                        if name == variable_name and _periods_overlap(period, dependent_period)
+                        ]:
+                    dependents.discard(dependent)
+
+    def update_persons(self, persons, inputs, requests = ()):
+        """
+        Change the inputs of a few persons, and update the values calculated from these inputs by recalculating them for these persons only.
+
+        A sub-simulation is built with ``persons``, their group entities, and the other members of these entities. The values of the simulation that don't depend on ``inputs`` are copied to it, and the values that depend on them are recalculated there, then scattered back into the simulation.
+
+        This assumes that formulas only combine the values of an entity with the values of its members, which is the case unless they aggregate values over the whole population.
+
+        :param persons: Boolean mask, or indices, of the persons whose inputs change
+        :param inputs: Dict mapping variable names to dicts mapping periods to the new values of the variable, as given to :any:`set_input`. They must only differ from the former inputs for ``persons`` and their entities.
+        :param requests: ``(variable_name, period)`` pairs to calculate once the simulation is updated
+
+        :returns: The same dict as :any:`calculate_many`, for ``requests``
+
+        Example:
+
+        >>> simulation.update_persons([12], {'salary': {'2017-01': salaries}}, [('disposable_income', '2017-01')])
+        >>> {('disposable_income', '2017-01'): array([2000., ..., 3500.])}
+        """
+        persons = numpy.asarray(persons)
+        if persons.dtype == bool:
+            persons = numpy.flatnonzero(persons)
+        rows = self._get_rows_of_members(persons)
+
+        # Keep the outdated values, to update them only for the affected rows
+        outdated_values = {}
+        for variable_name, values_by_period in inputs.items():
+            for period in values_by_period:
+                period = periods.period(period)
+                for name, dependent_period in self._get_dependents(variable_name, self._get_dependency_period(variable_name, period)):
+                    value = self.get_holder(name).get_array(dependent_period)
+                    if value is not None:
+                        outdated_values[(name, dependent_period)] = value
+
+        for variable_name, values_by_period in inputs.items():
+            for period, value in values_by_period.items():
+                # Replace the former inputs, that set_input may refuse to override
+                self.get_holder(variable_name).delete_arrays(periods.period(period))
+                self.set_input(variable_name, period, value)
+
+        subset_simulation = self._build_subset_simulation(rows)
+        for (variable_name, period), value in outdated_values.items():
+            population = self.get_variable_population(variable_name)
+            value = value.copy()
+            value[rows[population.entity.key]] = subset_simulation.calculate(variable_name, period)
+            population.get_holder(variable_name).put_in_cache(value, period)
+
+        return self.calculate_many(requests)
+
+    def _get_rows_of_members(self, persons):
+        """
+        Get, by entity key, the rows of ``persons``, of their group entities, and of all the members of these entities.
+        """
+        group_populations = [population for population in self.populations.values() if not population.entity.is_person]
+        selected_persons = numpy.zeros(self.persons.count, dtype = bool)
+        selected_persons[persons] = True
+
+        while True:
+            selected_entities = {}
+            members = selected_persons.copy()
+            for population in group_populations:
+                entities = numpy.zeros(population.count, dtype = bool)
+                entities[population.members_entity_id[selected_persons]] = True
+                members |= entities[population.members_entity_id]
+                selected_entities[population.entity.key] = entities
+            if (members == selected_persons).all():
+                break
+            # Members of the selected entities belong to other entities, which must be selected too
+            selected_persons = members
+
+        rows = {key: numpy.flatnonzero(entities) for key, entities in selected_entities.items()}
+        rows[self.persons.entity.key] = numpy.flatnonzero(selected_persons)
+        return rows
+
+    def _build_subset_simulation(self, rows):
+        persons_rows = rows[self.persons.entity.key]
+        persons = self.persons.get_subset(persons_rows)
+        populations = {persons.entity.key: persons}
+        for key, population in self.populations.items():
+            if not population.entity.is_person:
+                populations[key] = population.get_subset(rows[key], persons, persons_rows)
+
+        simulation = Simulation(self.tax_benefit_system, populations)
+        simulation.max_spiral_loops = self.max_spiral_loops
+        simulation.opt_out_cache = self.opt_out_cache
+
+        # Values which are up to date
+        for key, population in self.populations.items():
+            for variable_name, holder in population._holders.items():
+                subset_holder = populations[key].get_holder(variable_name)
+                for period in holder.get_known_periods():
+                    subset_holder.put_in_cache(holder.get_array(period)[rows[key]], period)
+
+        return simulation
+
     def purge_cache_of_invalid_values(self):
         # We wait for the end of calculate(), signalled by an empty stack, before purging the cache
         if self.tracer.stack:
@@ -224,6 +430,7 @@ class Simulation:
         else:
             parameters_at = self.tax_benefit_system.get_parameters_at_instant
 
+        self._formula_calculations.add((variable.name, period))
         if formula.__code__.co_argcount == 2:
             array = formula(population, period)
         else:
@@ -280,10 +487,9 @@ class Simulation:
         the same variable at a different period.
         """
         # The last frame is the current calculation, so it should be ignored from cycle detection
-        previous_periods = [frame['period'] for frame in self.tracer.stack[:-1] if frame['name'] == variable]
-        if period in previous_periods:
+        if self.tracer.get_nb_calculation_frames(variable, period) > 1:
             raise CycleError("Circular definition detected on formula {}@{}".format(variable, period))
-        spiral = len(previous_periods) >= self.max_spiral_loops
+        spiral = self.tracer.get_nb_frames(variable) - 1 >= self.max_spiral_loops
         if spiral:
             self.invalidate_spiral_variables(variable)
             message = "Quasicircular definition detected on formula {}@{} involving {}".format(variable, period, self.tracer.stack)
@@ -366,7 +572,10 @@ class Simulation:
         >>> simulation.get_array('age', '2018-05') is None
         True
         """
+        if period is not None:
+            period = periods.period(period)
         self.get_holder(variable).delete_arrays(period)
+        self.invalidate_dependents(variable, self._get_dependency_period(variable, period))
 
     def get_known_periods(self, variable):
         """
@@ -408,6 +617,17 @@ class Simulation:
             return
         self.get_holder(variable_name).set_input(period, value)
 
+        if self._dependents:
+            dependency_period = self._get_dependency_period(variable_name, period)
+            self._forget_dependencies(variable_name, dependency_period)
+            self.invalidate_dependents(variable_name, dependency_period)
+
+    def _get_dependency_period(self, variable_name, period):
+        # Values of eternal variables are the same whatever the period they have been requested for
+        if self.tax_benefit_system.get_variable(variable_name).definition_period == periods.ETERNITY:
+            return None
+        return period
+
     def get_variable_population(self, variable_name):
         variable = self.tax_benefit_system.get_variable(variable_name, check_existence = True)
         return self.populations[variable.entity.key]
@@ -422,9 +642,18 @@ class Simulation:
     def describe_entities(self):
         return {population.entity.plural: population.ids for population in self.populations.values()}
 
-    def clone(self, debug = False, trace = False):
+    def clone(self, debug = False, trace = False, tax_benefit_system = None):
         """
         Copy the simulation just enough to be able to run the copy without modifying the original simulation
+
+        The copy is copy-on-write: its holders read the values known by the original simulation, and keep the values set or calculated in the copy in storages of their own. The original simulation should not be modified while the copy is used.
+
+        :param tax_benefit_system: A reform of the tax and benefit system of the simulation, to run the copy with. The values of the original simulation which the reform may change are not read by the copy: the values calculated with a replaced variable and the values calculated from them, or, if the reform modifies parameters, all the values calculated by formulas. The other values are reused, so that several reforms can be compared to the original simulation without calculating these values again.
+
+        Example:
+
+        >>> reform_simulation = simulation.clone(tax_benefit_system = reform)
+        >>> reform_simulation.calculate('disposable_income', '2017-01')  # Only calculates what the reform changes
         """
         new = commons.empty_clone(self)
         new_dict = new.__dict__
@@ -433,6 +662,11 @@ class Simulation:
             if key not in ('debug', 'trace', 'tracer'):
                 new_dict[key] = value
 
+        if tax_benefit_system is not None:
+            new.tax_benefit_system = tax_benefit_system
+        new.invalidated_caches = set()
+        new._data_storage_dir = None  # The copy stores its values on disk in a directory of its own
+
         new.persons = self.persons.clone(new)
         setattr(new, new.persons.entity.key, new.persons)
         new.populations = {new.persons.entity.key: new.persons}
@@ -442,7 +676,49 @@ class Simulation:
             new.populations[entity.key] = population
             setattr(new, entity.key, population)  # create shortcut simulation.household (for instance)
 
+        new._calculations = []
+        new._dependents = {
+            variable_name: {period: set(dependents) for period, dependents in dependents_by_period.items()}
+            for variable_name, dependents_by_period in self._dependents.items()
+            }
+        new._formula_calculations = set(self._formula_calculations)
+        if tax_benefit_system is not None:
+            new._hide_outdated_values(self.tax_benefit_system)
+
         new.debug = debug
         new.trace = trace
 
         return new
+
+    def _hide_outdated_values(self, baseline):
+        # Values calculated with the variables and parameters of baseline which differ in the tax and benefit system of the simulation
+        changed_variables = {
+            variable_name
+            for variable_name in set(baseline.variables) | set(self.tax_benefit_system.variables)
+            if baseline.variables.get(variable_name) is not self.tax_benefit_system.variables.get(variable_name)
+            }
+        # Formulas may read parameters in many ways, so every value they returned is outdated once a parameter changes
+        if _parameters_differ(baseline.parameters, self.tax_benefit_system.parameters):
+            outdated = set(self._formula_calculations)
+        else:
+            outdated = {(variable_name, period) for variable_name, period in self._formula_calculations if variable_name in changed_variables}
+        for variable_name, period in list(outdated):
+            outdated |= self._get_dependents(variable_name, period)
+
+        for variable_name, period in outdated:
+            if variable_name in self.tax_benefit_system.variables:
+                self.get_holder(variable_name).delete_arrays(period)
+
+
+def _parameters_differ(parameters, other_parameters):
+    if parameters is other_parameters:
+        return False
+    leaves = {parameter.name: parameter for parameter in parameters.get_descendants() if not isinstance(parameter, ParameterNode)}
+    other_leaves = {parameter.name: parameter for parameter in other_parameters.get_descendants() if not isinstance(parameter, ParameterNode)}
+    return leaves.keys() != other_leaves.keys() or any(repr(leaves[name]) != repr(other_leaves[name]) for name in leaves)
+
+
+def _periods_overlap(period, other):
+    if period is None or other is None or periods.ETERNITY in (period.unit, other.unit):
+        return True
+    return period.start <= other.stop and other.start <= period.stop
@@ -31,12 +31,19 @@ class SimulationBuilder:
         self.roles: typing.Dict[Entity.plural, typing.List[int]] = {}
 
         self.variable_entities: typing.Dict[Variable.name, Entity] = {}
+        # JSON input - Path of each null value of the input, i.e. of each value to calculate, as (entity plural, instance id, variable name, period string)
+        self.requested_computations: typing.List[typing.Tuple[Entity.plural, str, Variable.name, str]] = []
+
+        # Index of each id in the ids of each entity, built once per list of ids. Indexed by entities plural names.
+        self._ids_indices: typing.Dict[Entity.plural, typing.Tuple[typing.List[str], typing.Dict[str, int]]] = {}
+        # Normalized string of each period string found in the input
+        self._period_strs: typing.Dict[str, str] = {}
 
         self.axes = [[]]
         self.axes_entity_counts: typing.Dict[Entity.plural, int] = {}
-        self.axes_entity_ids: typing.Dict[Entity.plural, typing.List[int]] = {}
-        self.axes_memberships: typing.Dict[Entity.plural, typing.List[int]] = {}
-        self.axes_roles: typing.Dict[Entity.plural, typing.List[int]] = {}
+        self.axes_entity_ids: typing.Dict[Entity.plural, numpy.ndarray] = {}
+        self.axes_memberships: typing.Dict[Entity.plural, numpy.ndarray] = {}
+        self.axes_roles: typing.Dict[Entity.plural, numpy.ndarray] = {}
 
     def build_from_dict(self, tax_benefit_system, input_dict):
         """
@@ -65,7 +72,7 @@ class SimulationBuilder:
                 'households': {'household': {'parents': ['Javier']}}
                 })
         """
-        input_dict = copy.deepcopy(input_dict)
+        input_dict = copy.copy(input_dict)  # Don't mutate function input. Nested values are not modified.
 
         simulation = Simulation(tax_benefit_system, tax_benefit_system.instantiate_entities())
 
@@ -148,6 +155,97 @@ class SimulationBuilder:
                     simulation.set_input(variable, period_str, dated_value)
         return simulation
 
+    def build_from_tables(self, tax_benefit_system, tables, period = None):
+        """
+            Build a simulation from column tables, one per entity, setting whole columns at once.
+
+            ``tables`` maps entity keys or plurals to tables: dicts of numpy arrays, pandas ``DataFrame``, pyarrow ``Table``, or paths to ``.npz`` files (see :any:`helpers.read_columns`).
+
+            - An ``id`` column gives the ids of the entities. Without it, persons are numbered from 0, and group entities are identified by the ids their members refer to.
+            - In the persons table, for each group entity, a ``<entity key>_id`` column gives the id of the entity of each person, and an optional ``<entity key>_role`` column their role, as a role key or index. Persons have the first role by default. Without such columns, each person is alone in an entity.
+            - Other columns are values of variables: ``salary`` for ``period``, or ``salary/2017-01`` for a given period.
+
+            Example:
+
+            >>> simulation_builder.build_from_tables(tax_benefit_system, {
+                'person': {'id': ..., 'household_id': ..., 'household_role': ..., 'salary': ...},
+                'household': {'id': ..., 'rent': ...},
+                }, period = '2017-01')
+        """
+        tables = {key: helpers.read_columns(table) for key, table in tables.items()}
+        unexpected_tables = [key for key in tables if not any(key in (entity.key, entity.plural) for entity in tax_benefit_system.entities)]
+        if unexpected_tables:
+            raise SituationParsingError(unexpected_tables, "No entity named {} in the tax and benefit system.".format(', '.join(unexpected_tables)))
+
+        def get_table(entity):
+            return tables.get(entity.key, tables.get(entity.plural))
+
+        self.create_entities(tax_benefit_system)
+        person_entity = tax_benefit_system.person_entity
+        persons_table = get_table(person_entity)
+        if not persons_table:
+            raise SituationParsingError([person_entity.plural], 'No {0} found. At least one {0} must be defined to run a simulation.'.format(person_entity.key))
+        persons_table = dict(persons_table)  # Membership columns are popped
+
+        persons = self.populations[person_entity.key]
+        persons.ids = persons_table.pop('id', None)
+        persons.count = len(next(iter(persons_table.values()))) if persons.ids is None else len(persons.ids)
+        if persons.ids is None:
+            persons.ids = numpy.arange(persons.count)
+        self.persons_plural = person_entity.plural
+        columns = [(persons, persons_table)]
+
+        for entity in tax_benefit_system.group_entities:
+            population = self.populations[entity.key]
+            table = dict(get_table(entity) or {})
+            ids = table.pop('id', None)
+            members_ids = persons_table.pop(entity.key + '_id', None)
+            members_roles = persons_table.pop(entity.key + '_role', None)
+
+            if members_ids is None:
+                if table:
+                    raise SituationParsingError([entity.plural], "The {} of the persons are unknown: add a column '{}_id' to the table of the {}.".format(entity.plural, entity.key, person_entity.plural))
+                # Each person is alone in an entity
+                ids, members_ids = persons.ids, persons.ids
+            elif ids is None:
+                ids = numpy.unique(members_ids)
+            elif not numpy.isin(members_ids, ids).all():
+                raise SituationParsingError([person_entity.plural, entity.key + '_id'], "Some {} are not in the table of the {}.".format(entity.plural, entity.plural))
+
+            population.ids = ids
+            population.count = len(ids)
+            if members_roles is None:
+                members_roles = numpy.zeros(persons.count, dtype = numpy.int16)
+            self.join_with_persons(population, members_ids, members_roles)
+            columns.append((population, table))
+
+        simulation = self.build(tax_benefit_system)
+
+        # Set the inputs of the smallest periods first, as set_input may divide the values of larger periods
+        inputs = []
+        for population, table in columns:
+            for column_name, values in table.items():
+                variable_name, _, period_str = column_name.partition('/')
+                try:
+                    population.entity.check_variable_defined_for_entity(variable_name)
+                except ValueError as e:
+                    raise SituationParsingError([population.entity.plural, column_name], e.args[0])
+                except VariableNotFoundError as e:
+                    raise SituationParsingError([population.entity.plural, column_name], str(e), code = 404)
+                variable = tax_benefit_system.get_variable(variable_name)
+                if variable.definition_period == periods.ETERNITY:
+                    period_str = periods.ETERNITY
+                elif not period_str:
+                    if period is None:
+                        raise SituationParsingError([population.entity.plural, column_name], "No period given for the values of '{}'. Name the column '{}/<period>', or give a default period.".format(variable_name, variable_name))
+                    period_str = period
+                inputs.append((periods.period(period_str), variable_name, values))
+
+        for period_value, variable_name, values in sorted(inputs, key = lambda item: periods.key_period_size(item[0])):
+            simulation.set_input(variable_name, period_value, values)
+
+        return simulation
+
     def build_default_simulation(self, tax_benefit_system, count = 1):
         """
             Build a simulation where:
@@ -185,18 +283,20 @@ class SimulationBuilder:
 
     def join_with_persons(self, group_population, persons_group_assignment, roles: typing.Iterable[str]):
         # Maps group's identifiers to a 0-based integer range, for indexing into members_roles (see PR#876)
-        group_sorted_indices = numpy.unique(persons_group_assignment, return_inverse = True)[1]
-        group_population.members_entity_id = numpy.argsort(group_population.ids)[group_sorted_indices]
+        # Groups may have no member, so identifiers are looked up among all the group ids
+        ids = numpy.asarray(group_population.ids)
+        sorted_indices = numpy.argsort(ids)
+        group_population.members_entity_id = sorted_indices[numpy.searchsorted(ids, persons_group_assignment, sorter = sorted_indices)]
 
         flattened_roles = group_population.entity.flattened_roles
         roles_array = numpy.array(roles)
         if numpy.issubdtype(roles_array.dtype, numpy.integer):
-            group_population.members_role = numpy.array(flattened_roles)[roles_array]
+            group_population.members_role_index = roles_array
         else:
             if len(flattened_roles) == 0:
                 group_population.members_role = numpy.int64(0)
             else:
-                group_population.members_role = numpy.select([roles_array == role.key for role in flattened_roles], flattened_roles)
+                group_population.members_role_index = numpy.select([roles_array == role.key for role in flattened_roles], range(len(flattened_roles)))
 
     def build(self, tax_benefit_system):
         return Simulation(tax_benefit_system, self.populations)
@@ -239,9 +339,9 @@ class SimulationBuilder:
         self.entity_ids[self.persons_plural] = entity_ids
         self.entity_counts[self.persons_plural] = len(entity_ids)
 
-        for instance_id, instance_object in instances_json.items():
+        for instance_index, (instance_id, instance_object) in enumerate(instances_json.items()):
             helpers.check_type(instance_object, dict, [entity.plural, instance_id])
-            self.init_variable_values(entity, instance_object, str(instance_id))
+            self.init_variable_values(entity, instance_object, str(instance_id), instance_index)
 
         return self.get_ids(entity.plural)
 
@@ -264,13 +364,16 @@ class SimulationBuilder:
 
         persons_count = len(persons_ids)
         persons_to_allocate = set(persons_ids)
+        persons_indices = self._get_ids_index(persons_plural, persons_ids)
         self.memberships[entity.plural] = numpy.empty(persons_count, dtype = numpy.int32)
         self.roles[entity.plural] = numpy.empty(persons_count, dtype = object)
 
         self.entity_ids[entity.plural] = entity_ids
         self.entity_counts[entity.plural] = len(entity_ids)
 
-        for instance_id, instance_object in instances_json.items():
+        role_by_plural = {role.plural or role.key: role for role in entity.roles}
+
+        for entity_index, (instance_id, instance_object) in enumerate(instances_json.items()):
             helpers.check_type(instance_object, dict, [entity.plural, instance_id])
 
             variables_json = instance_object.copy()  # Don't mutate function input
@@ -285,15 +388,12 @@ class SimulationBuilder:
                 for index, person_id in enumerate(role_definition):
                     entity_plural = entity.plural
                     self.check_persons_to_allocate(persons_plural, entity_plural,
-                                                   persons_ids,
+                                                   persons_indices,
                                                    person_id, instance_id, role_id,
                                                    persons_to_allocate, index)
 
                     persons_to_allocate.discard(person_id)
 
-            entity_index = entity_ids.index(instance_id)
-            role_by_plural = {role.plural or role.key: role for role in entity.roles}
-
             for role_plural, persons_with_role in roles_json.items():
                 role = role_by_plural[role_plural]
 
@@ -301,20 +401,22 @@ class SimulationBuilder:
                     raise SituationParsingError([entity.plural, instance_id, role_plural], f"There can be at most {role.max} {role_plural} in a {entity.key}. {len(persons_with_role)} were declared in '{instance_id}'.")
 
                 for index_within_role, person_id in enumerate(persons_with_role):
-                    person_index = persons_ids.index(person_id)
+                    person_index = persons_indices[person_id]
                     self.memberships[entity.plural][person_index] = entity_index
                     person_role = role.subroles[index_within_role] if role.subroles else role
                     self.roles[entity.plural][person_index] = person_role
 
-            self.init_variable_values(entity, variables_json, instance_id)
+            self.init_variable_values(entity, variables_json, str(instance_id), entity_index)
 
         if persons_to_allocate:
-            entity_ids = entity_ids + list(persons_to_allocate)
-            for person_id in persons_to_allocate:
-                person_index = persons_ids.index(person_id)
-                self.memberships[entity.plural][person_index] = entity_ids.index(person_id)
+            # Each person who has not been allocated is alone in a new entity
+            persons_to_allocate = list(persons_to_allocate)
+            for entity_index, person_id in enumerate(persons_to_allocate, len(entity_ids)):
+                person_index = persons_indices[person_id]
+                self.memberships[entity.plural][person_index] = entity_index
                 self.roles[entity.plural][person_index] = entity.flattened_roles[0]
             # Adjust previously computed ids and counts
+            entity_ids = entity_ids + persons_to_allocate
             self.entity_ids[entity.plural] = entity_ids
             self.entity_counts[entity.plural] = len(entity_ids)
 
@@ -347,7 +449,10 @@ class SimulationBuilder:
                     person_id, entity_plural)
                 )
 
-    def init_variable_values(self, entity, instance_object, instance_id):
+    def init_variable_values(self, entity, instance_object, instance_id, instance_index = None):
+        if instance_index is None:
+            instance_index = self._get_ids_index(entity.plural, self.get_ids(entity.plural))[instance_id]
+
         for variable_name, variable_values in instance_object.items():
             path_in_json = [entity.plural, instance_id, variable_name]
             try:
@@ -357,42 +462,55 @@ class SimulationBuilder:
             except VariableNotFoundError as e:  # The variable doesn't exist
                 raise SituationParsingError(path_in_json, str(e), code = 404)
 
-            instance_index = self.get_ids(entity.plural).index(instance_id)
-
             if not isinstance(variable_values, dict):
                 if self.default_period is None:
                     raise SituationParsingError(path_in_json,
                         "Can't deal with type: expected object. Input variables should be set for specific periods. For instance: {'salary': {'2017-01': 2000, '2017-02': 2500}}, or {'birth_date': {'ETERNITY': '1980-01-01'}}.")
                 variable_values = {self.default_period: variable_values}
 
+            variable = entity.get_variable(variable_name)
             for period_str, value in variable_values.items():
                 try:
-                    periods.period(period_str)
+                    self._get_period_str(period_str)
                 except ValueError as e:
                     raise SituationParsingError(path_in_json, e.args[0])
-                variable = entity.get_variable(variable_name)
                 self.add_variable_value(entity, variable, instance_index, instance_id, period_str, value)
 
     def add_variable_value(self, entity, variable, instance_index, instance_id, period_str, value):
         path_in_json = [entity.plural, instance_id, variable.name, period_str]
 
         if value is None:
+            self.requested_computations.append((entity.plural, instance_id, variable.name, period_str))
             return
 
-        array = self.get_input(variable.name, str(period_str))
-
-        if array is None:
-            array_size = self.get_count(entity.plural)
-            array = variable.default_array(array_size)
+        period_str = self._get_period_str(period_str)
+        array = self.get_input(variable.name, period_str)
 
         try:
             value = variable.check_set_value(value)
         except ValueError as error:
             raise SituationParsingError(path_in_json, *error.args)
 
+        if array is None:
+            array_size = self.get_count(entity.plural)
+            # Values of all instances are written in the same array
+            array = self.input_buffer[variable.name][period_str] = variable.default_array(array_size)
+
         array[instance_index] = value
 
-        self.input_buffer[variable.name][str(periods.period(period_str))] = array
+    def _get_period_str(self, period_str):
+        period_str = str(period_str)
+        normalized_period_str = self._period_strs.get(period_str)
+        if normalized_period_str is None:
+            normalized_period_str = self._period_strs[period_str] = str(periods.period(period_str))
+        return normalized_period_str
+
+    def _get_ids_index(self, entity_plural, ids):
+        # Map each id of ``ids`` to its index, building the map only once for a given list of ids
+        ids_index = self._ids_indices.get(entity_plural)
+        if ids_index is None or ids_index[0] is not ids:
+            ids_index = self._ids_indices[entity_plural] = (ids, {id: index for index, id in enumerate(ids)})
+        return ids_index[1]
 
     def finalize_variables_init(self, population):
         # Due to set_input mechanism, we must bufferize all inputs, then actually set them,
@@ -400,10 +518,10 @@ class SimulationBuilder:
         plural_key = population.entity.plural
         if plural_key in self.entity_counts:
             population.count = self.get_count(plural_key)
-            population.ids = self.get_ids(plural_key)
+            population.ids = self._get_ids(plural_key)
         if plural_key in self.memberships:
-            population.members_entity_id = numpy.array(self.get_memberships(plural_key))
-            population.members_role = numpy.array(self.get_roles(plural_key))
+            population.members_entity_id = numpy.asarray(self._get_memberships(plural_key))
+            population.members_role = numpy.asarray(self.get_roles(plural_key))
         for variable_name in self.input_buffer.keys():
             try:
                 holder = population.get_holder(variable_name)
@@ -444,10 +562,20 @@ class SimulationBuilder:
 
     # Returns the ids of instances of this entity, including when there is replication along axes
     def get_ids(self, entity_name):
+        ids = self._get_ids(entity_name)
+        # Ids replicated along axes are kept in a numpy array, which populations use as is
+        return ids.tolist() if entity_name in self.axes_entity_ids else ids
+
+    def _get_ids(self, entity_name):
         return self.axes_entity_ids.get(entity_name, self.entity_ids[entity_name])
 
     # Returns the memberships of individuals in this entity, including when there is replication along axes
     def get_memberships(self, entity_name):
+        memberships = self._get_memberships(entity_name)
+        # Memberships replicated along axes are kept in a numpy array, which populations use as is
+        return memberships.tolist() if entity_name in self.axes_memberships else memberships
+
+    def _get_memberships(self, entity_name):
         # Return empty array for the "persons" entity
         return self.axes_memberships.get(entity_name, self.memberships.get(entity_name, []))
 
@@ -476,25 +604,20 @@ class SimulationBuilder:
             cell_count *= axis_count
 
         # Scale the "prototype" situation, repeating it cell_count times
-        for entity_name in self.entity_counts.keys():
+        # The prototype is always the situation before expansion, so that this method can be called again
+        for entity_name, entity_count in self.entity_counts.items():
             # Adjust counts
-            self.axes_entity_counts[entity_name] = self.get_count(entity_name) * cell_count
+            self.axes_entity_counts[entity_name] = entity_count * cell_count
             # Adjust ids
-            original_ids = self.get_ids(entity_name) * cell_count
-            indices = numpy.arange(0, cell_count * self.entity_counts[entity_name])
-            adjusted_ids = [id + str(ix) for id, ix in zip(original_ids, indices)]
-            self.axes_entity_ids[entity_name] = adjusted_ids
+            self.axes_entity_ids[entity_name] = helpers.index_ids(self.entity_ids[entity_name], entity_count * cell_count)
             # Adjust roles
-            original_roles = self.get_roles(entity_name)
-            adjusted_roles = original_roles * cell_count
-            self.axes_roles[entity_name] = adjusted_roles
+            original_roles = numpy.asarray(self.roles.get(entity_name, []), dtype = object)
+            self.axes_roles[entity_name] = numpy.tile(original_roles, cell_count)
             # Adjust memberships, for group entities only
             if entity_name != self.persons_plural:
-                original_memberships = self.get_memberships(entity_name)
-                repeated_memberships = original_memberships * cell_count
-                indices = numpy.repeat(numpy.arange(0, cell_count), len(original_memberships)) * self.entity_counts[entity_name]
-                adjusted_memberships = (numpy.array(repeated_memberships) + indices).tolist()
-                self.axes_memberships[entity_name] = adjusted_memberships
+                original_memberships = numpy.asarray(self.memberships[entity_name], dtype = numpy.int32)
+                offsets = numpy.arange(cell_count, dtype = numpy.int32) * entity_count
+                self.axes_memberships[entity_name] = (original_memberships + offsets[:, None]).ravel()
 
         # Now generate input values along the specified axes
         # TODO - factor out the common logic here
@@ -23,4 +23,5 @@
 
 from openfisca_core.errors import VariableNameConflict, VariableNotFound  # noqa: F401
 
+from .parameters_at_instant_cache import ParametersAtInstantCache  # noqa: F401
 from .tax_benefit_system import TaxBenefitSystem  # noqa: F401
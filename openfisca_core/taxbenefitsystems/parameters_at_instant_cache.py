@@ -0,0 +1,69 @@
+import collections
+import threading
+
+
+class ParametersAtInstantCache:
+    """
+    Cache of the parameters of a tax and benefit system at given instants, with a least recently used eviction policy.
+
+    :param max_size: Maximum number of instants kept in the cache. If ``None``, the cache is unbounded.
+
+    The cache counts its hits and misses, so that its efficiency can be monitored:
+
+    >>> tax_benefit_system.parameters_at_instant_cache.get_statistics()
+    >>> {'hits': 120, 'misses': 12, 'size': 12, 'max_size': 1024}
+    """
+
+    def __init__(self, max_size = None):
+        if max_size is not None and max_size < 1:
+            raise ValueError("max_size must be a positive integer, or None. Got: {}.".format(max_size))
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._values = collections.OrderedDict()
+        self._lock = threading.Lock()  # Web API workers may share the cache between threads
+
+    def get(self, instant, default = None):
+        with self._lock:
+            value = self._values.get(instant)
+            if value is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._values.move_to_end(instant)
+            return value
+
+    def __getitem__(self, instant):
+        value = self.get(instant)
+        if value is None:
+            raise KeyError(instant)
+        return value
+
+    def __setitem__(self, instant, value):
+        with self._lock:
+            self._values[instant] = value
+            self._values.move_to_end(instant)
+            if self.max_size is not None:
+                while len(self._values) > self.max_size:
+                    self._values.popitem(last = False)
+
+    def __contains__(self, instant):
+        return instant in self._values
+
+    def __len__(self):
+        return len(self._values)
+
+    def invalidate(self):
+        """
+        Remove every cached value, for instance because the parameters have been modified.
+        """
+        with self._lock:
+            self._values.clear()
+
+    def get_statistics(self):
+        return dict(
+            hits = self.hits,
+            misses = self.misses,
+            size = len(self._values),
+            max_size = self.max_size,
+            )
@@ -16,6 +16,7 @@ from openfisca_core.parameters import ParameterNode
 from openfisca_core.periods import Instant, Period
 from openfisca_core.populations import Population, GroupPopulation
 from openfisca_core.simulations import SimulationBuilder
+from openfisca_core.taxbenefitsystems import ParametersAtInstantCache
 from openfisca_core.variables import Variable
 
 log = logging.getLogger(__name__)
@@ -42,11 +43,12 @@ class TaxBenefitSystem:
     baseline = None  # Baseline tax-benefit system. Used only by reforms. Note: Reforms can be chained.
     cache_blacklist = None
     decomposition_file_path = None
+    parameters_at_instant_cache_size = 1024  # Maximum number of instants for which the parameters are cached. None for no limit.
 
     def __init__(self, entities):
         # TODO: Currently: Don't use a weakref, because they are cleared by Paste (at least) at each call.
         self.parameters = None
-        self._parameters_at_instant_cache = {}  # weakref.WeakValueDictionary()
+        self._parameters_at_instant_cache = ParametersAtInstantCache(self.parameters_at_instant_cache_size)
         self.variables = {}
         self.open_api_config = {}
         # Tax benefit systems are mutable, so entities (which need to know about our variables) can't be shared among them
@@ -58,6 +60,13 @@ class TaxBenefitSystem:
         for entity in self.entities:
             entity.set_tax_benefit_system(self)
 
+    @property
+    def parameters_at_instant_cache(self):
+        """
+        Cache of the parameters at the instants requested so far. Reforms that do not modify the parameters share the cache of their baseline.
+        """
+        return self._parameters_at_instant_cache
+
     @property
     def base_tax_benefit_system(self):
         base_tax_benefit_system = self._base_tax_benefit_system
@@ -327,6 +336,8 @@ class TaxBenefitSystem:
             parameters = self.preprocess_parameters(parameters)
 
         self.parameters = parameters
+        # The cache may be shared with other tax and benefit systems, whose parameters have not changed
+        self._parameters_at_instant_cache = ParametersAtInstantCache(self._parameters_at_instant_cache.max_size)
 
     def _get_baseline_parameters_at_instant(self, instant):
         baseline = self.baseline
@@ -437,7 +448,7 @@ class TaxBenefitSystem:
             entity.set_tax_benefit_system(new)
 
         new_dict['parameters'] = self.parameters.clone()
-        new_dict['_parameters_at_instant_cache'] = {}
+        new_dict['_parameters_at_instant_cache'] = ParametersAtInstantCache(self._parameters_at_instant_cache.max_size)
         new_dict['variables'] = self.variables.copy()
         new_dict['open_api_config'] = self.open_api_config.copy()
         return new
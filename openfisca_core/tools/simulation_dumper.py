@@ -7,6 +7,7 @@ import numpy as np
 
 from openfisca_core.simulations import Simulation
 from openfisca_core.data_storage import OnDiskStorage
+from openfisca_core.indexed_enums import EnumArray
 from openfisca_core.periods import ETERNITY
 
 
@@ -65,6 +66,7 @@ def _dump_holder(holder, directory):
     for period in holder.get_known_periods():
         value = holder.get_array(period)
         disk_storage.put(value, period)
+    disk_storage.flush()
 
 
 def _dump_entity(population, directory):
@@ -97,8 +99,8 @@ def _restore_entity(population, directory):
     if population.entity.is_person:
         return
 
-    population.members_position = np.load(os.path.join(path, "members_position.npy"))
     population.members_entity_id = np.load(os.path.join(path, "members_entity_id.npy"))
+    population.members_position = np.load(os.path.join(path, "members_position.npy"))
     encoded_roles = np.load(os.path.join(path, "members_role.npy"))
 
     flattened_roles = population.entity.flattened_roles
@@ -128,4 +130,6 @@ def _restore_holder(simulation, variable, directory):
 
     for period in disk_storage.get_known_periods():
         value = disk_storage.get(period)
+        if isinstance(value, EnumArray):
+            value = EnumArray(value.view(np.ndarray), holder.variable.possible_values)
         holder.put_in_cache(value, period)
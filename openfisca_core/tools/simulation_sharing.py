@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+
+import numpy as np
+
+from openfisca_core import periods
+from openfisca_core.data_storage.shared_arrays import SharedArrays
+from openfisca_core.indexed_enums import EnumArray
+from openfisca_core.simulations import Simulation
+
+
+def share_simulation(simulation, path = None):
+    """
+        Publish the entities and the variable values of ``simulation`` in shared memory, or in a memory-mapped file at ``path`` if given, so that simulations of other processes can be attached to them with :any:`attach_simulation`.
+
+        :returns: The :any:`SharedArrays`, which can be sent to other processes. Call its ``unlink`` method once they don't need them anymore.
+    """
+    arrays = {}
+
+    for population in simulation.populations.values():
+        _share_entity(population, arrays)
+        for holder in population._holders.values():
+            for period in holder.get_known_periods():
+                value = holder.get_array(period)
+                if isinstance(value, EnumArray):
+                    value = value.view(np.ndarray)
+                arrays['variables/{}/{}'.format(holder.variable.name, period)] = value
+
+    return SharedArrays.publish(arrays, path)
+
+
+def attach_simulation(shared_arrays, tax_benefit_system):
+    """
+        Build a simulation reading the entities and the variable values published by :any:`share_simulation`, without copying them.
+
+        The shared values are read-only. Values calculated by the simulation belong to the current process.
+    """
+    simulation = Simulation(tax_benefit_system, tax_benefit_system.instantiate_entities())
+
+    for population in simulation.populations.values():
+        _attach_entity(population, shared_arrays)
+
+    for name in shared_arrays.keys():
+        kind, *key = name.split('/')
+        if kind != 'variables':
+            continue
+        variable, period = key
+        holder = simulation.get_holder(variable)
+        holder.set_shared_input(periods.period(period), shared_arrays[name])
+
+    return simulation
+
+
+def _share_entity(population, arrays):
+    path = 'entities/{}/'.format(population.entity.key)
+    arrays[path + 'ids'] = np.asarray(population.ids)
+
+    if population.entity.is_person:
+        return
+
+    if population._roles_table != list(population.entity.flattened_roles):
+        raise ValueError("The roles of the {} can't be shared, as some of them are not roles of the entity.".format(population.entity.plural))
+    arrays[path + 'members_entity_id'] = np.asarray(population.members_entity_id)
+    arrays[path + 'members_role_index'] = population.members_role_index
+
+
+def _attach_entity(population, shared_arrays):
+    path = 'entities/{}/'.format(population.entity.key)
+    population.ids = shared_arrays[path + 'ids']
+    population.count = len(population.ids)
+
+    if population.entity.is_person:
+        return
+
+    population.members_entity_id = shared_arrays[path + 'members_entity_id']
+    population.members_role_index = shared_arrays[path + 'members_role_index']
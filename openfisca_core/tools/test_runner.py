@@ -186,42 +186,62 @@ class YamlItem(pytest.Item):
 
         if output is None:
             return
+
+        checks = []
         for key, expected_value in output.items():
             if self.tax_benefit_system.get_variable(key):  # If key is a variable
-                self.check_variable(key, expected_value, self.test.get('period'))
+                checks.extend(self.get_variable_checks(key, expected_value, self.test.get('period')))
             elif self.simulation.populations.get(key):  # If key is an entity singular
                 for variable_name, value in expected_value.items():
-                    self.check_variable(variable_name, value, self.test.get('period'))
+                    checks.extend(self.get_variable_checks(variable_name, value, self.test.get('period')))
             else:
                 population = self.simulation.get_population(plural = key)
                 if population is not None:  # If key is an entity plural
                     for instance_id, instance_values in expected_value.items():
                         for variable_name, value in instance_values.items():
                             entity_index = population.get_index(instance_id)
-                            self.check_variable(variable_name, value, self.test.get('period'), entity_index)
+                            checks.extend(self.get_variable_checks(variable_name, value, self.test.get('period'), entity_index))
                 else:
                     raise VariableNotFound(key, self.tax_benefit_system)
 
+        self.assert_variables(checks)
+
     def check_variable(self, variable_name, expected_value, period, entity_index = None):
+        self.assert_variables(self.get_variable_checks(variable_name, expected_value, period, entity_index))
+
+    def get_variable_checks(self, variable_name, expected_value, period, entity_index = None):
+        """
+        List the ``(variable_name, expected_value, period, entity_index)`` checks described by an output value, expanding the values given by period.
+        """
         if self.should_ignore_variable(variable_name):
-            return
+            return []
         if isinstance(expected_value, dict):
-            for requested_period, expected_value_at_period in expected_value.items():
-                self.check_variable(variable_name, expected_value_at_period, requested_period, entity_index)
-            return
-
-        actual_value = self.simulation.calculate(variable_name, period)
-
-        if entity_index is not None:
-            actual_value = actual_value[entity_index]
-        return assert_near(
-            actual_value,
-            expected_value,
-            absolute_error_margin = self.test.get('absolute_error_margin'),
-            message = f"{variable_name}@{period}: ",
-            relative_error_margin = self.test.get('relative_error_margin'),
+            return [
+                check
+                for requested_period, expected_value_at_period in expected_value.items()
+                for check in self.get_variable_checks(variable_name, expected_value_at_period, requested_period, entity_index)
+                ]
+        return [(variable_name, expected_value, period, entity_index)]
+
+    def assert_variables(self, checks):
+        actual_values = self.simulation.calculate_many(
+            (variable_name, period)
+            for variable_name, _expected_value, period, _entity_index in checks
             )
 
+        for variable_name, expected_value, period, entity_index in checks:
+            actual_value = actual_values[(variable_name, period)]
+
+            if entity_index is not None:
+                actual_value = actual_value[entity_index]
+            assert_near(
+                actual_value,
+                expected_value,
+                absolute_error_margin = self.test.get('absolute_error_margin'),
+                message = f"{variable_name}@{period}: ",
+                relative_error_margin = self.test.get('relative_error_margin'),
+                )
+
     def should_ignore_variable(self, variable_name):
         only_variables = self.options.get('only_variables')
         ignore_variables = self.options.get('ignore_variables')
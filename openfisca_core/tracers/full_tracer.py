@@ -63,6 +63,12 @@ class FullTracer:
     def stack(self):
         return self._simple_tracer.stack
 
+    def get_nb_frames(self, variable: str) -> int:
+        return self._simple_tracer.get_nb_frames(variable)
+
+    def get_nb_calculation_frames(self, variable: str, period) -> int:
+        return self._simple_tracer.get_nb_calculation_frames(variable, period)
+
     @property
     def trees(self):
         return self._trees
@@ -5,9 +5,13 @@ class SimpleTracer:
 
     def __init__(self):
         self._stack = []
+        # Number of frames in the stack, by variable name and by (variable name, period), so that cycles can be detected without scanning the stack
+        self._nb_frames_by_variable = {}
+        self._nb_frames_by_calculation = {}
 
     def record_calculation_start(self, variable: str, period):
         self.stack.append({'name': variable, 'period': period})
+        self._increment_frames(variable, period)
 
     def record_calculation_result(self, value: numpy.ndarray):
         pass  # ignore calculation result
@@ -16,8 +20,33 @@ class SimpleTracer:
         pass
 
     def record_calculation_end(self):
-        self.stack.pop()
+        frame = self.stack.pop()
+        self._decrement_frames(frame['name'], frame['period'])
 
     @property
     def stack(self):
         return self._stack
+
+    def get_nb_frames(self, variable: str) -> int:
+        """
+        Count the frames of the stack calculating ``variable``, for any period.
+        """
+        return self._nb_frames_by_variable.get(variable, 0)
+
+    def get_nb_calculation_frames(self, variable: str, period) -> int:
+        """
+        Count the frames of the stack calculating ``variable`` for ``period``.
+        """
+        return self._nb_frames_by_calculation.get((variable, period), 0)
+
+    def _increment_frames(self, variable: str, period):
+        self._nb_frames_by_variable[variable] = self._nb_frames_by_variable.get(variable, 0) + 1
+        calculation = (variable, period)
+        self._nb_frames_by_calculation[calculation] = self._nb_frames_by_calculation.get(calculation, 0) + 1
+
+    def _decrement_frames(self, variable: str, period):
+        for counter, key in ((self._nb_frames_by_variable, variable), (self._nb_frames_by_calculation, (variable, period))):
+            if counter[key] == 1:
+                del counter[key]
+            else:
+                counter[key] -= 1
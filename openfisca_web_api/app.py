@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+import itertools
+import json
 import logging
 import os
 import traceback
@@ -10,7 +12,7 @@ from openfisca_web_api.errors import handle_import_error
 from openfisca_web_api import handlers
 
 try:
-    from flask import Flask, jsonify, abort, request, make_response
+    from flask import Flask, Response, jsonify, abort, request, make_response
     from flask_cors import CORS
     from werkzeug.middleware.proxy_fix import ProxyFix
     import werkzeug.exceptions
@@ -38,6 +40,48 @@ def init_tracker(url, idsite, tracker_token):
         log.warn(message)
 
 
+def stream_json(data, chunk_size = 65536, default = None):
+    """
+        Encode ``data``, a dict of dicts such as a situation, to utf-8 JSON piece by piece, so that the whole response is never held in memory.
+
+        Each value of the second level, e.g. each person of a situation, is encoded at once. ``default`` encodes the values ``json`` can't, as in ``json.dumps``.
+
+        The first chunk is encoded before this function returns, so that an error raised by the first values is raised before a response starts.
+    """
+    chunks = _encode_json_chunks(data, chunk_size, default)
+    first_chunk = next(chunks)
+    return itertools.chain([first_chunk], chunks)
+
+
+def _encode_json_chunks(data, chunk_size, default):
+    def encode(value):
+        return json.dumps(value, ensure_ascii = False, separators = (',', ':'), default = default)
+
+    def pieces():
+        yield '{'
+        for entity_index, (entity_key, entities) in enumerate(data.items()):
+            yield (',' if entity_index else '') + encode(entity_key) + ':'
+            if not isinstance(entities, dict):
+                yield encode(entities)
+                continue
+            yield '{'
+            for index, (key, value) in enumerate(entities.items()):
+                yield (',' if index else '') + encode(key) + ':' + encode(value)
+            yield '}'
+        yield '}\n'
+
+    chunk = []
+    chunk_length = 0
+    for piece in pieces():
+        chunk.append(piece)
+        chunk_length += len(piece)
+        if chunk_length >= chunk_size:
+            yield ''.join(chunk).encode('utf-8')
+            chunk = []
+            chunk_length = 0
+    yield ''.join(chunk).encode('utf-8')
+
+
 def create_app(tax_benefit_system,
                tracker_url = None,
                tracker_idsite = None,
@@ -142,7 +186,8 @@ def create_app(tax_benefit_system,
             abort(make_response(jsonify(e.error), e.code or 400))
         except (UnicodeEncodeError, UnicodeDecodeError) as e:
             abort(make_response(jsonify({"error": "'" + e[1] + "' is not a valid ASCII value."}), 400))
-        return jsonify(result)
+        # Large batch results are written to the client as they are encoded. Values such as dates are encoded as by jsonify
+        return Response(stream_json(result, default = app.json_encoder().default), mimetype = 'application/json')
 
     @app.route('/trace', methods=['POST'])
     def trace():
@@ -7,31 +7,41 @@ from openfisca_core.indexed_enums import Enum
 
 
 def calculate(tax_benefit_system, input_data):
-    simulation = SimulationBuilder().build_from_entities(tax_benefit_system, input_data)
+    """
+        Calculate the null values of ``input_data``, and write their results in place of them.
 
-    requested_computations = dpath.util.search(input_data, '*/*/*/*', afilter = lambda t: t is None, yielded = True)
-    computation_results = {}
+        The values to calculate are found while the simulation is built, so that ``input_data`` is walked only once and never copied.
+    """
+    simulation_builder = SimulationBuilder()
+    simulation = simulation_builder.build_from_entities(tax_benefit_system, input_data)
 
-    for computation in requested_computations:
-        path = computation[0]
-        entity_plural, entity_id, variable_name, period = path.split('/')
+    # Group the requested cells by computation, so that each result is converted once
+    requested_cells = {}
+    for entity_plural, entity_id, variable_name, period in simulation_builder.requested_computations:
+        requested_cells.setdefault((variable_name, period), []).append((entity_plural, entity_id))
+    results = simulation.calculate_many(requested_cells)
+
+    ids_indices = {}  # Index of each id of each entity, built once
+    for (variable_name, period), cells in requested_cells.items():
+        entity_plural = cells[0][0]
+        if entity_plural not in ids_indices:
+            population = simulation.get_population(entity_plural)
+            ids_indices[entity_plural] = {entity_id: index for index, entity_id in enumerate(population.ids)}
+        ids_index = ids_indices[entity_plural]
         variable = tax_benefit_system.get_variable(variable_name)
-        result = simulation.calculate(variable_name, period)
-        population = simulation.get_population(entity_plural)
-        entity_index = population.get_index(entity_id)
+        result = results[(variable_name, period)][[ids_index[entity_id] for _entity_plural, entity_id in cells]]
 
         if variable.value_type == Enum:
-            entity_result = result.decode()[entity_index].name
+            entity_results = result.decode_to_str().tolist()
         elif variable.value_type == float:
-            entity_result = float(str(result[entity_index]))  # To turn the float32 into a regular float without adding confusing extra decimals. There must be a better way.
+            entity_results = result.astype(str).astype(float).tolist()  # To turn the float32 into a regular float without adding confusing extra decimals. There must be a better way.
         elif variable.value_type == str:
-            entity_result = str(result[entity_index])
+            entity_results = result.astype(str).tolist()
         else:
-            entity_result = result.tolist()[entity_index]
-
-        dpath.util.new(computation_results, path, entity_result)
+            entity_results = result.tolist()
 
-    dpath.merge(input_data, computation_results)
+        for (entity_plural, entity_id), entity_result in zip(cells, entity_results):
+            input_data[entity_plural][entity_id][variable_name][period] = entity_result
 
     return input_data
 
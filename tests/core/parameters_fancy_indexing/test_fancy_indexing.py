@@ -146,3 +146,32 @@ def test_with_enum():
 
     zone = np.asarray([TypesZone.z1, TypesZone.z2, TypesZone.z2, TypesZone.z1])
     assert_near(P.single.owner[zone], [100, 200, 200, 100])
+
+
+def test_with_enum_array():
+
+    class TypesZone(Enum):
+        z1 = "Zone 1"
+        z2 = "Zone 2"
+        z3 = "Zone 3"
+
+    zone = TypesZone.encode(np.asarray(['z1', 'z2', 'z2', 'z1']))
+    assert_near(P.single.owner[zone], [100, 200, 200, 100])
+
+    with pytest.raises(ParameterNotFound) as e:
+        P.single.owner[TypesZone.encode(np.asarray(['z1', 'z3']))]
+    assert "'rate.single.owner.z3' was not found" in get_message(e.value)
+
+
+def test_with_integer_keys():
+    city_code = np.asarray([75012, 75007, 75015, 75012])
+    assert_near(P_2[city_code], [100, 300, 200, 100])
+
+
+def test_lookup_tables_are_reused():
+    node = P.single
+    zone = np.asarray(['z1', 'z2', 'z2', 'z1'])
+    housing_occupancy_status = np.asarray(['owner', 'owner', 'tenant', 'tenant'])
+    assert_near(node[housing_occupancy_status][zone], [100, 200, 400, 300])
+    assert node._vectorial_node is not None
+    assert_near(node[housing_occupancy_status[::-1]][zone], [300, 400, 200, 100])
@@ -148,6 +148,16 @@ def test_add_axis_distributes_memberships(simulation_builder, persons, group_ent
     assert simulation_builder.get_memberships('households') == [0, 1, 1, 2, 3, 3]
 
 
+def test_expand_axes_twice(simulation_builder, persons):
+    simulation_builder.add_person_entity(persons, {'Alicia': {}, 'Javier': {}})
+    simulation_builder.register_variable('salary', persons)
+    simulation_builder.add_parallel_axis({'count': 6, 'name': 'salary', 'min': 0, 'max': 3000, 'period': '2018-11'})
+    simulation_builder.expand_axes()
+    simulation_builder.expand_axes()
+    assert simulation_builder.get_count('persons') == 12
+    assert simulation_builder.get_ids('persons')[-3:] == ['Javier9', 'Alicia10', 'Javier11']
+
+
 def test_add_perpendicular_axes(simulation_builder, persons):
     simulation_builder.add_person_entity(persons, {'Alicia': {}})
     simulation_builder.register_variable('salary', persons)
@@ -201,3 +211,22 @@ def test_simulation_with_axes(simulation_builder):
     simulation = simulation_builder.build_from_dict(tax_benefit_system, data)
     assert simulation.get_array('salary', '2018-11') == approx([0, 0, 0, 0, 0, 0])
     assert simulation.get_array('rent', '2018-11') == approx([0, 0, 3000, 0])
+
+
+def test_simulation_with_many_cells(simulation_builder):
+    # Axes used to be expanded with Python lists, and roles copied from lists: 100,000 cells took more than a second before any formula ran. See openfisca_core/scripts/measure_simulation_builder.py
+    data = {
+        'persons': {'Alicia': {}, 'Javier': {}},
+        'households': {'housea': {'parents': ['Alicia'], 'children': ['Javier']}},
+        'axes': [[{'count': 100000, 'name': 'salary', 'min': 0, 'max': 99999, 'period': '2018-11'}]],
+        }
+    simulation = simulation_builder.build_from_dict(tax_benefit_system, data)
+
+    assert simulation.persons.count == 200000
+    assert simulation.persons.ids.dtype.kind == 'U'  # Ids are not copied into a list
+    assert simulation.persons.ids[-2:].tolist() == ['Alicia199998', 'Javier199999']
+    assert simulation.household.ids[-1] == 'housea99999'
+    assert simulation.household.get_index('housea99999') == 99999
+    assert simulation.household.members_entity_id[-2:].tolist() == [99999, 99999]
+    assert [role.key for role in simulation.household.members_role[-2:]] == ['first_parent', 'child']
+    assert simulation.get_array('salary', '2018-11')[-2:] == approx([99999, 0])
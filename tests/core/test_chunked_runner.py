@@ -0,0 +1,100 @@
+import numpy
+
+from openfisca_core.simulations import ChunkedRunner, SimulationBuilder
+from openfisca_core.tools import assert_near
+
+from .test_countries import tax_benefit_system
+
+
+REQUESTS = [
+    ('income_tax', '2017-01'),
+    ('total_taxes', '2017-01'),
+    ('housing_tax', '2017'),
+    ('housing_occupancy_status', '2017-01'),
+    ]
+
+
+def build_population():
+    random = numpy.random.RandomState(7)
+    households_sizes = random.randint(1, 5, size = 25)
+    nb_persons = households_sizes.sum()
+
+    # Members of a household are not contiguous
+    members_entity_id = numpy.repeat(numpy.arange(len(households_sizes)), households_sizes)
+    random.shuffle(members_entity_id)
+    persons_ids = numpy.arange(nb_persons) * 10
+    households_ids = numpy.arange(len(households_sizes)) + 1000
+    members_role = numpy.full(nb_persons, 'child', dtype = object)
+    members_role[numpy.unique(members_entity_id, return_index = True)[1]] = 'first_parent'
+
+    inputs = {
+        'salary': {'2017-01': random.randint(0, 5000, size = nb_persons).astype(float)},
+        'accommodation_size': {'2017-01': random.randint(20, 200, size = len(households_sizes)).astype(float)},
+        'housing_occupancy_status': {'2017-01': random.choice(['owner', 'tenant', 'free_lodger'], size = len(households_sizes))},
+        }
+    return persons_ids, (households_ids, members_entity_id, members_role), inputs
+
+
+def add_empty_household(households, inputs):
+    households_ids, members_entity_id, members_role = households
+    inputs['accommodation_size']['2017-01'] = numpy.append(inputs['accommodation_size']['2017-01'], 300.)
+    inputs['housing_occupancy_status']['2017-01'] = numpy.append(inputs['housing_occupancy_status']['2017-01'], 'owner')
+    return (numpy.append(households_ids, 5000), members_entity_id, members_role), inputs
+
+
+def calculate_monolithically(persons_ids, households, inputs, requests = REQUESTS):
+    households_ids, members_entity_id, members_role = households
+    builder = SimulationBuilder()
+    builder.create_entities(tax_benefit_system)
+    builder.declare_person_entity('person', persons_ids)
+    household = builder.declare_entity('household', households_ids)
+    builder.join_with_persons(household, households_ids[members_entity_id], members_role)
+    simulation = builder.build(tax_benefit_system)
+    for variable_name, values in inputs.items():
+        for period, value in values.items():
+            simulation.set_input(variable_name, period, value)
+    return simulation.calculate_many(requests)
+
+
+def test_chunks_dont_split_entities():
+    persons_ids, households, inputs = build_population()
+    runner = ChunkedRunner(tax_benefit_system, persons_ids, {'household': households}, inputs, chunk_size = 10)
+    chunks = runner.get_chunks()
+
+    assert sorted(numpy.concatenate(chunks)) == list(range(len(persons_ids)))
+    members_entity_id = households[1]
+    chunks_households = [set(members_entity_id[rows]) for rows in chunks]
+    assert sum(len(chunk_households) for chunk_households in chunks_households) == len(households[0])
+    assert all(len(rows) <= 10 for rows in chunks)
+
+
+def test_chunked_run_matches_monolithic_simulation(tmpdir):
+    persons_ids, households, inputs = build_population()
+    expected = calculate_monolithically(persons_ids, households, inputs)
+
+    runner = ChunkedRunner(tax_benefit_system, persons_ids, {'household': households}, inputs, chunk_size = 10)
+    assert len(runner.get_chunks()) > 1
+    results = runner.run(REQUESTS, str(tmpdir))
+
+    assert set(results) == set(REQUESTS)
+    for request in REQUESTS:
+        if request[0] == 'housing_occupancy_status':
+            assert (results[request].decode_to_str() == expected[request].decode_to_str()).all()
+        else:
+            assert_near(results[request], expected[request], absolute_error_margin = 1e-6)
+    assert tmpdir.join('income_tax_2017-01.npy').check()
+
+
+def test_chunked_run_calculates_entities_without_members(tmpdir):
+    persons_ids, households, inputs = build_population()
+    households, inputs = add_empty_household(households, inputs)
+    # Formulas summing over the members of households don't support households without members
+    requests = [('housing_tax', '2017'), ('housing_occupancy_status', '2017-01')]
+    expected = calculate_monolithically(persons_ids, households, inputs, requests)
+
+    runner = ChunkedRunner(tax_benefit_system, persons_ids, {'household': households}, inputs, chunk_size = 10)
+    results = runner.run(requests, str(tmpdir))
+
+    assert results[('housing_tax', '2017')][-1] > 0
+    assert_near(results[('housing_tax', '2017')], expected[('housing_tax', '2017')], absolute_error_margin = 1e-6)
+    assert (results[('housing_occupancy_status', '2017-01')].decode_to_str() == expected[('housing_occupancy_status', '2017-01')].decode_to_str()).all()
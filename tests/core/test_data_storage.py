@@ -0,0 +1,136 @@
+import multiprocessing
+import pickle
+import sys
+
+import numpy
+import pytest
+
+from openfisca_core import periods
+from openfisca_core.data_storage import CompressedArray, InMemoryStorage
+from openfisca_core.data_storage.shared_arrays import SharedArrays
+from openfisca_core.indexed_enums import EnumArray
+from openfisca_core.tools import assert_near
+
+from openfisca_country_template.variables.housing import HousingOccupancyStatus
+
+
+def test_compress_booleans():
+    array = numpy.random.rand(1000) > 0.5
+    compressed = CompressedArray.compress(array)
+    assert compressed.encoding == 'bits'
+    assert compressed.physical_nb_bytes == 125
+    assert (compressed.decompress() == array).all()
+
+
+def test_compress_sparse():
+    array = numpy.zeros(1000, dtype = numpy.float32)
+    array[[3, 500]] = [10, 20]
+    compressed = CompressedArray.compress(array)
+    assert compressed.encoding == 'sparse'
+    assert compressed.nbytes == array.nbytes
+    assert_near(compressed.decompress(), array)
+
+
+def test_compress_low_cardinality():
+    array = EnumArray(numpy.repeat(numpy.array([1, 2], dtype = numpy.int16), 500), HousingOccupancyStatus)
+    compressed = CompressedArray.compress(array)
+    assert compressed.encoding == 'zlib'
+    decompressed = compressed.decompress()
+    assert decompressed.possible_values is HousingOccupancyStatus
+    assert (decompressed == array).all()
+
+
+def test_do_not_compress_random_values():
+    assert CompressedArray.compress(numpy.random.rand(1000)) is None
+
+
+def test_in_memory_storage_compress():
+    storage = InMemoryStorage()
+    period = periods.period('2017-01')
+    array = numpy.zeros(1000)
+    storage.put(array, period)
+
+    assert storage.compress(period) < array.nbytes
+    memory_usage = storage.get_memory_usage()
+    assert memory_usage['total_nb_bytes'] == array.nbytes
+    assert memory_usage['physical_nb_bytes'] < array.nbytes
+
+    assert_near(storage.get(period), array)  # Decompressed on access
+    assert storage.get_memory_usage()['physical_nb_bytes'] == array.nbytes
+
+
+def test_narrow_integers():
+    array = numpy.array([0, 100, -20], dtype = numpy.int32)
+    narrowed = CompressedArray.narrow(array)
+    assert narrowed.data[0].dtype == numpy.int8
+    assert narrowed.decompress().dtype == numpy.int32
+    assert (narrowed.decompress() == array).all()
+
+    assert CompressedArray.narrow(array, min_dtype = numpy.int16).data[0].dtype == numpy.int16
+    assert CompressedArray.narrow(numpy.array([2 ** 20], dtype = numpy.int32)) is None
+    assert CompressedArray.narrow(numpy.array([0.5])) is None
+
+
+def test_in_memory_storage_narrow_dtypes():
+    storage = InMemoryStorage(narrow_dtypes = True)
+    storage.put(numpy.array([1, 2], dtype = numpy.int32), periods.period('2017-01'))
+    storage.put(numpy.array([1, 1000], dtype = numpy.int32), periods.period('2017-02'))  # Widens the storage dtype
+    storage.put(numpy.array([1, 2], dtype = numpy.int32), periods.period('2017-03'))
+    storage.put(numpy.ones(16, dtype = bool), periods.period('2017-04'))
+
+    assert [storage.get_nb_bytes(month) for month in ['2017-01', '2017-02', '2017-03', '2017-04']] == [2, 4, 4, 2]
+    assert storage.get('2017-02').dtype == numpy.int32
+    assert (storage.get('2017-02') == [1, 1000]).all()
+    assert storage.get('2017-04').dtype == bool
+    assert storage.get('2017-04').all()
+    assert storage.get_nb_bytes('2017-02') == 4 + 8  # The decoded vector is kept next to the narrowed one
+
+    # Repeated reads don't decode the vector again
+    decoded = storage.get('2017-02')
+    assert storage.get('2017-02') is decoded
+    assert storage.compress('2017-02') == 4
+    assert storage.get('2017-02') is not decoded
+    storage.put(numpy.array([1, 2], dtype = numpy.int32), periods.period('2017-02'))
+    assert (storage.get('2017-02') == [1, 2]).all()
+
+
+def test_in_memory_storage_shared():
+    shared_arrays = SharedArrays.publish({'value': numpy.arange(1000, dtype = numpy.int32)})
+    try:
+        storage = InMemoryStorage(narrow_dtypes = True)
+        storage.put(shared_arrays['value'], '2017-01', shared = True)
+
+        assert storage.get('2017-01') is not None
+        assert numpy.shares_memory(storage.get('2017-01'), shared_arrays['value'])
+        assert storage.compress('2017-01') == 0
+        assert storage.get_memory_usage()['physical_nb_bytes'] == 0
+
+        storage.put(numpy.arange(1000, dtype = numpy.int32), '2017-01')
+        assert storage.get_nb_bytes('2017-01') > 0
+    finally:
+        shared_arrays.unlink()
+
+
+def test_shared_arrays_without_shared_memory(tmpdir, monkeypatch):
+    # Python versions before 3.8 have no multiprocessing.shared_memory
+    monkeypatch.delattr(multiprocessing, 'shared_memory', raising = False)
+    monkeypatch.setitem(sys.modules, 'multiprocessing.shared_memory', None)
+
+    with pytest.raises(ImportError, match = 'Python 3.8'):
+        SharedArrays.publish({'value': numpy.arange(10)})
+
+    shared_arrays = SharedArrays.publish({'value': numpy.arange(10)}, str(tmpdir.join('arrays')))
+    assert (shared_arrays['value'] == numpy.arange(10)).all()
+    shared_arrays.unlink()
+
+
+def test_shared_arrays_allocate(tmpdir):
+    shared_arrays = SharedArrays.allocate({'value': (numpy.float32, 10)}, str(tmpdir.join('arrays')))
+    try:
+        attached_arrays = pickle.loads(pickle.dumps(shared_arrays))  # As in another process
+        attached_arrays['value'][2:4] = 1.5
+
+        assert (shared_arrays['value'] == [0, 0, 1.5, 1.5, 0, 0, 0, 0, 0, 0]).all()
+        attached_arrays.close()
+    finally:
+        shared_arrays.unlink()
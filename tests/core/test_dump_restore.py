@@ -39,3 +39,18 @@ def test_dump():
     assert_array_equal(cached_value, calculated_value)
 
     shutil.rmtree(directory)
+
+
+def test_dump_enum():
+    directory = tempfile.mkdtemp(prefix = "openfisca_")
+    simulation = SimulationBuilder().build_from_entities(tax_benefit_system, couple)
+    calculated_value = simulation.calculate('housing_occupancy_status', '2018-01')
+    dump_simulation(simulation, directory)
+
+    simulation_2 = restore_simulation(directory, tax_benefit_system)
+
+    cached_value = simulation_2.household.get_holder('housing_occupancy_status').get_array('2018-01')
+    assert cached_value.possible_values is tax_benefit_system.get_variable('housing_occupancy_status').possible_values
+    assert_array_equal(cached_value.decode_to_str(), calculated_value.decode_to_str())
+
+    shutil.rmtree(directory)
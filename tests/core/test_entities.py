@@ -2,6 +2,8 @@
 
 from copy import deepcopy
 
+import numpy
+
 from openfisca_core.simulation_builder import SimulationBuilder
 from openfisca_core.tools import assert_near
 from openfisca_core.tools.test_runner import yaml
@@ -299,6 +301,30 @@ def test_min():
     assert_near(age_min_parents, [37, 54])
 
 
+def test_reduce_with_unsorted_members_and_empty_entity():
+    simulation = new_simulation(TEST_CASE)
+    household = simulation.household
+    household.members_entity_id = numpy.array([2, 0, 2, 0, 0, 2])
+    household.count = 3
+
+    values = numpy.array([4, 1, 9, 7, 3, 2])
+
+    assert (household.max(values) == [7, - numpy.inf, 9]).all()
+    assert (household.min(values) == [1, numpy.inf, 2]).all()
+    assert (household.all(values > 1) == [False, True, True]).all()
+
+
+def test_reduce_with_custom_reducer():
+    test_case = deepcopy(TEST_CASE_AGES)
+    simulation = new_simulation(test_case)
+    household = simulation.household
+
+    age = household.members('age', period = MONTH)
+
+    age_max = household.reduce(age, reducer = lambda x, y: numpy.maximum(x, y), neutral_element = 0)
+    assert_near(age_max, [40, 54])
+
+
 def test_value_nth_person():
     test_case = deepcopy(TEST_CASE_AGES)
     simulation = new_simulation(test_case)
@@ -497,3 +523,38 @@ def test_unordered_persons():
     assert_near(household.project(accommodation_size), [60, 160, 160, 160, 60, 160])
     assert_near(household.project(accommodation_size, role = PARENT), [60, 0, 160, 0, 0, 160])
     assert_near(household.project(accommodation_size, role = CHILD), [0, 160, 0, 160, 60, 0])
+
+
+def test_members_position_with_unsorted_members():
+    simulation = new_simulation(TEST_CASE)
+    household = simulation.household
+    household.members_entity_id = numpy.array([1, 0, 1, 0, 0, 1])
+
+    assert_near(household.members_position, [0, 0, 1, 1, 2, 2])
+    assert_near(household.members_entity_id[household.ordered_members_map], [0, 0, 0, 1, 1, 1])
+    assert_near(household.ordered_members_map, [1, 3, 4, 0, 2, 5])
+
+
+def test_members_role_index():
+    simulation = new_simulation(TEST_CASE)
+    household = simulation.household
+
+    assert_near(household.members_role_index, [0, 1, 2, 2, 0, 2])
+
+    household.members_role_index = [2, 2, 0, 1, 0, 2]
+    assert (household.members_role == [CHILD, CHILD, FIRST_PARENT, SECOND_PARENT, FIRST_PARENT, CHILD]).all()
+    assert_near(simulation.person.has_role(PARENT), [False, False, True, True, True, False])
+
+
+def test_role_masks_are_cached_until_roles_change():
+    simulation = new_simulation(TEST_CASE)
+    household = simulation.household
+
+    is_child = simulation.person.has_role(CHILD)
+    is_child[0] = True  # Masks returned by has_role can be modified without altering the cache
+    assert household.get_role_mask(CHILD) is household.get_role_mask(CHILD)
+    assert_near(household.get_role_mask(CHILD), [False, False, True, True, False, True])
+
+    household.members_role = [CHILD, FIRST_PARENT, CHILD, CHILD, FIRST_PARENT, CHILD]
+    assert_near(simulation.person.has_role(CHILD), [True, False, True, True, False, True])
+    assert_near(household.nb_persons(role = PARENT), [1, 1])
@@ -0,0 +1,33 @@
+import numpy
+
+from openfisca_core.indexed_enums import Enum, EnumArray
+
+
+class HousingOccupancyStatus(Enum):
+    tenant = "Tenant"
+    owner = "Owner"
+    free_lodger = "Free lodger"
+
+
+def test_encode_strings():
+    encoded = HousingOccupancyStatus.encode(numpy.array(['owner', 'free_lodger', 'owner', 'unknown']))
+    assert isinstance(encoded, EnumArray)
+    assert encoded.tolist() == [1, 2, 1, 0]  # Unknown names are encoded as the first item
+
+
+def test_encode_items():
+    items = numpy.array([HousingOccupancyStatus.free_lodger, HousingOccupancyStatus.tenant], dtype = object)
+    assert HousingOccupancyStatus.encode(items).tolist() == [2, 0]
+
+
+def test_decode():
+    encoded = EnumArray(numpy.array([[2, 0], [1, 1]]), HousingOccupancyStatus)
+    assert encoded.decode().tolist() == [
+        [HousingOccupancyStatus.free_lodger, HousingOccupancyStatus.tenant],
+        [HousingOccupancyStatus.owner, HousingOccupancyStatus.owner],
+        ]
+    assert encoded.decode_to_str().tolist() == [['free_lodger', 'tenant'], ['owner', 'owner']]
+
+
+def test_lookup_tables_are_cached():
+    assert HousingOccupancyStatus._get_lookup_tables() is HousingOccupancyStatus._get_lookup_tables()
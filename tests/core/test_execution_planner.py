@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+from openfisca_core import periods
+from openfisca_core.simulation_builder import SimulationBuilder
+from openfisca_core.simulations import ExecutionPlanner
+from openfisca_core.tools import assert_near
+
+from openfisca_country_template.situation_examples import couple
+
+from .test_countries import tax_benefit_system
+from . import test_cycles
+
+
+def new_simulation():
+    return SimulationBuilder().build_from_entities(tax_benefit_system, couple)
+
+
+def test_plan_is_recorded_in_dependency_order():
+    planner = ExecutionPlanner(tax_benefit_system)
+    planner.calculate_many(new_simulation(), [('disposable_income', '2017-01')])
+
+    plan = planner.get_plan([('disposable_income', '2017-01')])
+    steps = [variable_name for variable_name, _period in plan]
+
+    assert steps[-1] == 'disposable_income'
+    assert steps.index('salary') < steps.index('income_tax') < steps.index('disposable_income')
+
+
+def test_plan_is_reused_for_periods_of_the_same_shape():
+    planner = ExecutionPlanner(tax_benefit_system)
+    planner.calculate_many(new_simulation(), [('disposable_income', '2017-01')])
+
+    plan = planner.get_plan([('disposable_income', '2018-01')])
+
+    assert plan is not None
+    assert plan[-1] == ('disposable_income', periods.period('2018-01'))
+    assert planner.get_plan([('disposable_income', '2018')]) is None
+    # Periods derived from the year or the first month of the request would be misplaced
+    assert planner.get_plan([('disposable_income', '2018-06')]) is None
+
+
+def test_plan_with_yearly_dependency_is_replayed_across_years():
+    planner = ExecutionPlanner(tax_benefit_system)
+    planner.calculate_many(new_simulation(), [('total_taxes', '2017-01')])
+    assert ('housing_tax', periods.period('2017')) in planner.get_plan([('total_taxes', '2017-01')])
+
+    assert ('housing_tax', periods.period('2018')) in planner.get_plan([('total_taxes', '2018-01')])
+
+    simulation = new_simulation()
+    planned = planner.calculate_many(simulation, [('total_taxes', '2018-06')])
+    assert_near(planned[('total_taxes', '2018-06')], new_simulation().calculate('total_taxes', '2018-06'))
+    assert simulation.get_holder('housing_tax').get_known_periods() == [periods.period('2018')]
+
+
+def test_planned_results_match_recursive_results():
+    planner = ExecutionPlanner(tax_benefit_system)
+    requests = [('disposable_income', '2017-01'), ('housing_allowance', '2017-01')]
+    planner.calculate_many(new_simulation(), requests)
+
+    planned = planner.calculate_many(new_simulation(), requests)
+    recursive = new_simulation().calculate_many(requests)
+
+    for request in requests:
+        assert_near(planned[request], recursive[request])
+
+
+def test_spirals_are_not_planned():
+    planner = ExecutionPlanner(test_cycles.tax_benefit_system)
+    reference_period = periods.period('2013-01')
+
+    def new_cycle_simulation():
+        return SimulationBuilder().build_default_simulation(test_cycles.tax_benefit_system)
+
+    planner.calculate_many(new_cycle_simulation(), [('variable7', reference_period)])
+    planned = planner.calculate_many(new_cycle_simulation(), [('variable7', reference_period)])
+
+    assert [variable_name for variable_name, _period in planner.get_plan([('variable7', reference_period)])] == ['variable7']
+    assert_near(planned[('variable7', reference_period)], new_cycle_simulation().calculate('variable7', reference_period))
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 
+import os
+
 import numpy as np
+import psutil
 import pytest
 
 import openfisca_country_template.situation_examples
@@ -9,6 +12,7 @@ from openfisca_country_template.variables.housing import HousingOccupancyStatus
 from openfisca_core.periods import period as make_period, ETERNITY
 from openfisca_core.tools import assert_near
 from openfisca_core.memory_config import MemoryConfig
+from openfisca_core.data_storage import OnDiskStorage
 from openfisca_core.holders import Holder, set_input_dispatch_by_period
 from openfisca_core.errors import PeriodMismatchError
 from .test_countries import tax_benefit_system
@@ -108,6 +112,17 @@ def test_delete_arrays(single):
     assert simulation.person('salary', '2018-01') == 1250
 
 
+def test_delete_arrays_of_clone(single):
+    salary_holder = single.person.get_holder('salary')
+    salary_holder.set_input(make_period(2017), np.asarray([30000]))
+    clone_holder = single.clone().person.get_holder('salary')
+    clone_holder.delete_arrays(period = 2017)
+
+    assert clone_holder.get_array('2017-01') is None
+    assert clone_holder.get_known_periods() == []
+    assert salary_holder.get_array('2017-01') == 2500
+
+
 def test_get_memory_usage(single):
     simulation = single
     salary_holder = simulation.person.get_holder('salary')
@@ -174,6 +189,57 @@ def test_cache_disk(couple):
     assert_near(data, stored_data)
 
 
+def test_cache_disk_is_memory_mapped(couple):
+    simulation = couple
+    simulation.memory_config = force_storage_on_disk
+    holder = simulation.person.get_holder('disposable_income')
+    holder.put_in_cache(np.asarray([2000, 3000]), make_period('2017-01'))
+    holder.put_in_cache(np.asarray([4000, 5000]), make_period('2017-02'))
+
+    stored_data = holder.get_array('2017-01')
+    assert_near(stored_data, [2000, 3000])
+    assert not stored_data.flags.writeable
+    assert holder.get_array('2017-01') is stored_data  # No new read on cache hit
+    assert_near(holder.get_array('2017-02'), [4000, 5000])
+    assert os.listdir(holder._disk_storage.storage_dir) == ['values.dat']  # The index is only written when flushed
+    holder._disk_storage.flush()
+    assert sorted(os.listdir(holder._disk_storage.storage_dir)) == ['index.json', 'values.dat']
+
+
+def test_cache_disk_reuses_space(couple):
+    simulation = couple
+    simulation.memory_config = force_storage_on_disk
+    holder = simulation.person.get_holder('disposable_income')
+    holder.put_in_cache(np.asarray([2000., 3000.]), make_period('2017-01'))
+    data_path = os.path.join(holder._disk_storage.storage_dir, 'values.dat')
+
+    # A view in use is not overwritten
+    stored_data = holder.get_array('2017-01')
+    holder.delete_arrays('2017-01')
+    holder.put_in_cache(np.asarray([4000., 5000.]), make_period('2017-02'))
+    assert_near(stored_data, [2000, 3000])
+    data_size = os.path.getsize(data_path)
+
+    del stored_data
+    for month in range(3, 13):
+        holder.put_in_cache(np.asarray([float(month), 0.]), make_period('2017-02'))
+    assert_near(holder.get_array('2017-02'), [12, 0])
+    assert os.path.getsize(data_path) == data_size
+
+
+def test_restore_disk_storage_ignores_deleted_periods(tmpdir):
+    storage = OnDiskStorage(str(tmpdir), preserve_storage_dir = True)
+    storage.put(np.asarray(['a', 'b'], dtype = object), '2017-01')  # Stored in a .npy file of its own
+    storage.put(np.asarray([1, 2]), '2017-02')
+    storage.delete('2017-01')
+    storage.flush()
+
+    restored_storage = OnDiskStorage(str(tmpdir), preserve_storage_dir = True)
+    restored_storage.restore()
+    assert list(restored_storage.get_known_periods()) == [make_period('2017-02')]
+    assert_near(restored_storage.get('2017-02'), [1, 2])
+
+
 def test_known_periods(couple):
     simulation = couple
     simulation.memory_config = force_storage_on_disk
@@ -206,6 +272,97 @@ def test_set_not_cached_variable(single):
     assert simulation.calculate('salary', '2015-01') == array
 
 
+def test_spill_least_recently_used(couple):
+    simulation = couple
+    simulation.memory_config = MemoryConfig(max_memory_occupation = 1, max_memory_bytes = 16)  # 2 arrays of 2 float32
+    holder = simulation.person.get_holder('disposable_income')
+    holder.put_in_cache(np.asarray([1000, 1000]), make_period('2017-01'))
+    holder.put_in_cache(np.asarray([2000, 2000]), make_period('2017-02'))
+    holder.get_array('2017-01')  # 2017-02 is now the least recently used
+    holder.put_in_cache(np.asarray([3000, 3000]), make_period('2017-03'))
+
+    assert holder._memory_storage.get('2017-02') is None
+    assert_near(holder._disk_storage.get('2017-02'), [2000, 2000])
+    assert_near(holder.get_array('2017-02'), [2000, 2000])
+    assert simulation.cache_manager.get_memory_usage() == {'nb_arrays': 2, 'total_nb_bytes': 16, 'nb_spilled_arrays': 1}
+
+    holder.delete_arrays('2017-01')
+    assert simulation.cache_manager.nb_bytes == 8
+
+
+def test_spill_respects_priority_variables(couple):
+    simulation = couple
+    simulation.memory_config = MemoryConfig(max_memory_occupation = 1, max_memory_bytes = 0, priority_variables = ['salary'])
+    salary_holder = simulation.person.get_holder('salary')
+    salary_holder.put_in_cache(np.asarray([1000, 1000]), make_period('2017-01'))
+    holder = simulation.person.get_holder('disposable_income')
+    holder.put_in_cache(np.asarray([2000, 2000]), make_period('2017-01'))
+
+    assert salary_holder._memory_storage.get('2017-01') is not None
+    assert holder._memory_storage.get('2017-01') is None
+
+
+def test_compress_cold_arrays(couple):
+    simulation = couple
+    simulation.memory_config = MemoryConfig(max_memory_occupation = 1, max_memory_bytes = 12, compress_cold_arrays = True)
+    holder = simulation.person.get_holder('disposable_income')
+    holder.put_in_cache(np.asarray([0, 0]), make_period('2017-01'))
+    holder.put_in_cache(np.asarray([0, 0]), make_period('2017-02'))
+
+    # 2017-01 has been compressed rather than spilled
+    assert holder._disk_storage.get('2017-01') is None
+    assert holder.get_memory_usage()['physical_nb_bytes'] < holder.get_memory_usage()['total_nb_bytes']
+    assert_near(holder.get_array('2017-01'), [0, 0])
+
+
+def test_narrow_dtypes(couple):
+    simulation = couple
+    simulation.memory_config = MemoryConfig(max_memory_occupation = 1, narrow_dtypes = True)
+    holder = simulation.person.get_holder('age')
+    holder.set_input(make_period('2017-01'), np.asarray([40, 38]))
+
+    assert holder.get_memory_usage()['physical_nb_bytes'] == 2
+    result = simulation.calculate('age', '2017-01')
+    assert result.dtype == np.int32
+    assert_near(result, [40, 38])
+
+
+def test_cache_manager_indexes_arrays_by_storage(couple):
+    simulation = couple
+    simulation.memory_config = MemoryConfig(max_memory_occupation = 1, priority_variables = ['income_tax'])
+    pinned_holder = simulation.person.get_holder('income_tax')
+    holder = simulation.person.get_holder('disposable_income')
+    for month in range(1, 13):
+        pinned_holder.put_in_cache(np.asarray([1000, 1000]), make_period('2017-{:02d}'.format(month)))
+        holder.put_in_cache(np.asarray([2000, 2000]), make_period('2017-{:02d}'.format(month)))
+    cache_manager = simulation.cache_manager
+
+    # Arrays that can't be spilled are not candidates for spilling
+    assert len(cache_manager._arrays) == 12
+    assert len(cache_manager._periods[holder._memory_storage]) == 12
+
+    holder.delete_arrays('2017')
+    assert holder._memory_storage not in cache_manager._periods
+    assert cache_manager.get_memory_usage()['nb_arrays'] == 12
+
+    cache_manager._spill(0)
+    assert cache_manager.nb_bytes == 12 * 8
+    assert pinned_holder._memory_storage.get('2017-12') is not None
+
+
+def test_memory_occupation_is_sampled(couple, monkeypatch):
+    nb_probes = []
+    virtual_memory = psutil.virtual_memory
+    monkeypatch.setattr(psutil, 'virtual_memory', lambda: nb_probes.append(1) or virtual_memory())
+    simulation = couple
+    simulation.memory_config = MemoryConfig(max_memory_occupation = 1, sampling_interval = 10)
+    holder = simulation.person.get_holder('disposable_income')
+    for month in range(1, 13):
+        holder.put_in_cache(np.asarray([2000, 2000]), make_period(f'2017-{month:02}'))
+
+    assert len(nb_probes) == 2
+
+
 def test_set_input_float_to_int(single):
     simulation = single
     age = np.asarray([50.6])
@@ -0,0 +1,50 @@
+from openfisca_core.simulations import ParallelRunner
+from openfisca_core.tools import assert_near
+
+from .test_chunked_runner import REQUESTS, add_empty_household, build_population, calculate_monolithically
+from .test_countries import tax_benefit_system
+
+
+def test_parallel_run_matches_monolithic_simulation():
+    persons_ids, households, inputs = build_population()
+    expected = calculate_monolithically(persons_ids, households, inputs)
+
+    runner = ParallelRunner(tax_benefit_system, persons_ids, {'household': households}, inputs, max_workers = 2, chunk_size = 10)
+    results = runner.run(REQUESTS)
+
+    assert set(results) == set(REQUESTS)
+    for request in REQUESTS:
+        if request[0] == 'housing_occupancy_status':
+            assert (results[request].decode_to_str() == expected[request].decode_to_str()).all()
+        else:
+            assert_near(results[request], expected[request], absolute_error_margin = 1e-6)
+
+
+def test_parallel_run_calculates_entities_without_members():
+    persons_ids, households, inputs = build_population()
+    households, inputs = add_empty_household(households, inputs)
+    requests = [('housing_tax', '2017')]
+    expected = calculate_monolithically(persons_ids, households, inputs, requests)
+
+    runner = ParallelRunner(tax_benefit_system, persons_ids, {'household': households}, inputs, max_workers = 2, chunk_size = 10)
+    results = runner.run(requests)
+
+    assert results[('housing_tax', '2017')][-1] > 0
+    assert_near(results[('housing_tax', '2017')], expected[('housing_tax', '2017')], absolute_error_margin = 1e-6)
+
+
+def test_parallel_runner_default_shards():
+    persons_ids, households, inputs = build_population()
+    runner = ParallelRunner(tax_benefit_system, persons_ids, {'household': households}, inputs, max_workers = 4)
+    assert runner.chunk_size == -(-len(persons_ids) // 4)
+
+
+def test_parallel_run_shares_arrays_in_files(tmpdir):
+    persons_ids, households, inputs = build_population()
+    expected = calculate_monolithically(persons_ids, households, inputs)
+
+    runner = ParallelRunner(tax_benefit_system, persons_ids, {'household': households}, inputs, max_workers = 2, chunk_size = 10, shared_dir = str(tmpdir))
+    results = runner.run([('income_tax', '2017-01')])
+
+    assert_near(results[('income_tax', '2017-01')], expected[('income_tax', '2017-01')], absolute_error_margin = 1e-6)
+    assert tmpdir.listdir() == []
@@ -5,6 +5,7 @@ import tempfile
 import pytest
 
 from openfisca_core.parameters import ParameterNotFound, ParameterNode, ParameterNodeAtInstant, load_parameter_file
+from openfisca_core.taxbenefitsystems import ParametersAtInstantCache
 from .test_countries import tax_benefit_system
 
 
@@ -17,6 +18,25 @@ def test_get_at_instant():
     assert parameters_at_instant.benefits.basic_income == 600
 
 
+def test_get_at_instant_is_lazy():
+    parameters_at_instant = tax_benefit_system.parameters('2016-01-01')
+    assert 'taxes' not in vars(parameters_at_instant)
+
+    taxes = parameters_at_instant.taxes
+    assert parameters_at_instant.taxes is taxes
+    assert vars(taxes).get('income_tax_rate') is None
+    assert taxes['income_tax_rate'] == 0.15
+    assert list(parameters_at_instant) == list(tax_benefit_system.parameters.children)
+
+
+def test_get_at_instant_missing_child():
+    parameters_at_instant = tax_benefit_system.parameters('1997-12-31')
+    with pytest.raises(ParameterNotFound) as error:
+        parameters_at_instant.taxes.income_tax_rate
+    assert "taxes[income_tax_rate]" in str(error.value)
+    assert 'income_tax_rate' not in list(parameters_at_instant.taxes)
+
+
 def test_param_values():
     dated_values = {
         '2015-01-01': 0.15,
@@ -108,3 +128,28 @@ def test_name():
         }
     parameter = ParameterNode('root', data = parameter_data)
     assert parameter.children["2010"].name == "root.2010"
+
+
+def test_parameters_at_instant_cache_eviction():
+    cache = ParametersAtInstantCache(max_size = 2)
+    cache['2015-01-01'] = 'a'
+    cache['2016-01-01'] = 'b'
+    assert cache.get('2015-01-01') == 'a'  # 2015 is now the most recently used
+    cache['2017-01-01'] = 'c'
+
+    assert '2016-01-01' not in cache
+    assert cache.get('2016-01-01') is None
+    assert cache.get_statistics() == {'hits': 1, 'misses': 1, 'size': 2, 'max_size': 2}
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_parameters_at_instant_cache_statistics():
+    tax_benefit_system.parameters_at_instant_cache.invalidate()
+    hits = tax_benefit_system.parameters_at_instant_cache.hits
+
+    tax_benefit_system.get_parameters_at_instant('2016-01-01')
+    tax_benefit_system.get_parameters_at_instant('2016-01-01')
+
+    assert tax_benefit_system.parameters_at_instant_cache.hits == hits + 1
@@ -361,6 +361,25 @@ def test_modify_parameters():
     assert parameters_at_instant.new_node.new_param is True
 
 
+def test_parameters_cache_sharing():
+
+    def modify_parameters(reference_parameters):
+        reference_parameters.taxes.income_tax_rate.update(period = '2015', value = 0.2)
+        return reference_parameters
+
+    class test_modify_parameters(Reform):
+        def apply(self):
+            self.modify_parameters(modifier_function = modify_parameters)
+
+    reform = test_modify_parameters(tax_benefit_system)
+    neutralization_reform = WithBasicIncomeNeutralized(tax_benefit_system)
+
+    assert neutralization_reform.parameters_at_instant_cache is tax_benefit_system.parameters_at_instant_cache
+    assert reform.parameters_at_instant_cache is not tax_benefit_system.parameters_at_instant_cache
+    assert tax_benefit_system.get_parameters_at_instant('2015-01-01').taxes.income_tax_rate == 0.15
+    assert reform.get_parameters_at_instant('2015-01-01').taxes.income_tax_rate == 0.2
+
+
 def test_attributes_conservation():
 
     class some_variable(Variable):
@@ -406,3 +425,36 @@ def test_formulas_removal():
     baseline_variable = tax_benefit_system.get_variable('basic_income')
     assert len(reform_variable.formulas) == 0
     assert len(baseline_variable.formulas) > 0
+
+
+def test_clone_with_reform(make_simulation):
+    def modify_parameters(reference_parameters):
+        reference_parameters.taxes.income_tax_rate.update(period = '2015', value = 0.2)
+        return reference_parameters
+
+    class increase_income_tax(Reform):
+        def apply(self):
+            self.modify_parameters(modifier_function = modify_parameters)
+
+    data = {'salary': 3000, 'age': 30}
+    simulation = make_simulation(tax_benefit_system, '2017-01', data)
+    simulation.calculate('disposable_income', '2017-01')
+
+    for reform in (increase_income_tax(tax_benefit_system), WithBasicIncomeNeutralized(tax_benefit_system)):
+        reform_simulation = simulation.clone(tax_benefit_system = reform)
+        expected = make_simulation(reform, '2017-01', data)
+        assert_near(reform_simulation.calculate('disposable_income', '2017-01'), expected.calculate('disposable_income', '2017-01'))
+
+        # Inputs are read from the baseline simulation
+        assert reform_simulation.person.get_holder('salary').get_array('2017-01') is simulation.person.get_holder('salary').get_array('2017-01')
+
+    # Values which a reform of variables doesn't change are read from the baseline simulation, not calculated again
+    social_security_contribution = simulation.person.get_holder('social_security_contribution').get_array('2017-01')
+    assert reform_simulation.person.get_holder('social_security_contribution').get_array('2017-01') is social_security_contribution
+
+    # The baseline simulation is left untouched
+    assert_near(simulation.calculate('income_tax', '2017-01'), 3000 * 0.15, absolute_error_margin = 0.01)
+    assert_near(reform_simulation.calculate('income_tax', '2017-01'), 3000 * 0.15, absolute_error_margin = 0.01)
+    assert simulation.person.get_holder('income_tax').get_array('2017-01') is reform_simulation.person.get_holder('income_tax').get_array('2017-01')
+    assert_near(simulation.calculate('basic_income', '2017-01'), 600)
+    assert_near(reform_simulation.calculate('basic_income', '2017-01'), 0)
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import numpy
 from typing import Iterable
 
 from enum import Enum
@@ -529,3 +530,73 @@ def test_inconsistent_input(simulation_builder):
     with raises(ValueError) as error:
         simulation_builder.build_from_dict(tax_benefit_system, yaml.safe_load(input_yaml))
     assert "its length is 3 while there are 2" in error.value.args[0]
+
+
+def test_build_from_entities_with_unnormalized_periods():
+    situation = {'persons': {'Alicia': {'salary': {'2017-1': 1000}}, 'Javier': {'salary': {'2017-1': 2000}}}}
+    simulation = SimulationBuilder().build_from_entities(tax_benefit_system, situation)
+    assert_near(simulation.calculate('salary', '2017-01'), [1000, 2000])
+
+
+def test_build_from_large_situation():
+    # Looking up ids with list.index used to make building large situations quadratic: 40,000 persons took minutes. See openfisca_core/scripts/measure_simulation_builder.py
+    nb_persons = 40000
+    persons = {'p{}'.format(index): {'salary': {'2017-01': index}} for index in range(nb_persons)}
+    households = {
+        'h{}'.format(index): {'parents': ['p{}'.format(2 * index + 1)], 'children': ['p{}'.format(2 * index)], 'rent': {'2017-01': index}}
+        for index in range(nb_persons // 2)
+        }
+    situation = {'persons': persons, 'households': households}
+
+    simulation = SimulationBuilder().build_from_entities(tax_benefit_system, situation)
+
+    assert simulation.persons.count == nb_persons
+    assert simulation.household.count == nb_persons // 2
+    assert_near(simulation.calculate('salary', '2017-01')[[0, nb_persons - 1]], [0, nb_persons - 1])
+    assert_near(simulation.calculate('rent', '2017-01')[[0, nb_persons // 2 - 1]], [0, nb_persons // 2 - 1])
+    assert list(simulation.household.members_entity_id[-2:]) == [nb_persons // 2 - 1] * 2
+    assert [role.key for role in simulation.household.members_role[-2:]] == ['child', 'first_parent']
+    assert situation == {'persons': persons, 'households': households}
+
+
+def test_build_from_tables(tmpdir):
+    persons = {
+        'id': numpy.array(['Alicia', 'Javier', 'Tom', 'Sarah']),
+        'household_id': numpy.array([2, 1, 2, 2]),
+        'household_role': numpy.array(['first_parent', 'first_parent', 'second_parent', 'child']),
+        'salary': numpy.array([3000., 2000., 1000., 0.]),
+        'salary/2017-02': numpy.array([3500., 2000., 1000., 0.]),
+        'birth': numpy.array(['1980-01-01', '1985-01-01', '1982-01-01', '2010-01-01'], dtype = 'datetime64[D]'),
+        }
+    households = {
+        'id': numpy.array([1, 2, 3]),  # Household 3 has no members
+        'rent': numpy.array([500., 800., 600.]),
+        'housing_occupancy_status': numpy.array(['tenant', 'owner', 'free_lodger']),
+        }
+    numpy.savez(str(tmpdir.join('households.npz')), **households)
+
+    simulation = SimulationBuilder().build_from_tables(tax_benefit_system, {'persons': persons, 'household': str(tmpdir.join('households.npz'))}, period = '2017-01')
+
+    assert list(simulation.persons.ids) == ['Alicia', 'Javier', 'Tom', 'Sarah']
+    assert simulation.persons.get_index('Tom') == 2
+    assert simulation.household.count == 3
+    assert simulation.household.get_index(3) == 2
+    assert list(simulation.household.members_entity_id) == [1, 0, 1, 1]
+    assert [role.key for role in simulation.household.members_role] == ['first_parent', 'first_parent', 'second_parent', 'child']
+    assert_near(simulation.calculate('salary', '2017-02'), [3500, 2000, 1000, 0])
+    assert_near(simulation.calculate('rent', '2017-01'), [500, 800, 600])
+    assert simulation.calculate('housing_occupancy_status', '2017-01').decode_to_str().tolist() == ['tenant', 'owner', 'free_lodger']
+    assert_near(simulation.calculate('age', '2017-01'), [37, 32, 35, 7])
+
+
+def test_build_from_tables_without_memberships():
+    simulation = SimulationBuilder().build_from_tables(tax_benefit_system, {'person': {'salary/2017-01': numpy.array([3000., 2000.])}})
+    assert simulation.household.count == 2
+    assert list(simulation.household.members_entity_id) == [0, 1]
+    assert_near(simulation.calculate('salary', '2017-01'), [3000, 2000])
+
+
+def test_build_from_tables_without_period():
+    with raises(SituationParsingError) as error:
+        SimulationBuilder().build_from_tables(tax_benefit_system, {'person': {'salary': numpy.array([3000.])}})
+    assert 'salary' in str(error.value)
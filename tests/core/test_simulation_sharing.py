@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+
+import multiprocessing
+
+import numpy
+from numpy.testing import assert_array_equal
+
+from openfisca_core.simulation_builder import SimulationBuilder
+from openfisca_country_template.situation_examples import couple
+from openfisca_core.tools.simulation_sharing import attach_simulation, share_simulation
+
+from .test_countries import tax_benefit_system
+
+
+def calculate_disposable_income(shared_arrays):
+    simulation = attach_simulation(shared_arrays, tax_benefit_system)
+    return simulation.calculate('disposable_income', '2017-01')
+
+
+def test_attach_simulation():
+    simulation = SimulationBuilder().build_from_entities(tax_benefit_system, couple)
+    shared_arrays = share_simulation(simulation)
+
+    try:
+        simulation_2 = attach_simulation(shared_arrays, tax_benefit_system)
+
+        assert_array_equal(simulation.person.ids, simulation_2.person.ids)
+        assert simulation_2.household.count == simulation.household.count
+        assert_array_equal(simulation.household.members_entity_id, simulation_2.household.members_entity_id)
+        assert_array_equal(simulation.household.members_role, simulation_2.household.members_role)
+
+        # Inputs are read from shared memory, not copied
+        salary = simulation_2.person.get_holder('salary')
+        assert numpy.shares_memory(salary.get_array('2017-01'), shared_arrays['variables/salary/2017-01'])
+        assert not salary.get_array('2017-01').flags.writeable
+        assert salary.get_memory_usage()['physical_nb_bytes'] == 0
+
+        assert_array_equal(
+            simulation_2.calculate('disposable_income', '2017-01'),
+            simulation.calculate('disposable_income', '2017-01'),
+            )
+    finally:
+        shared_arrays.unlink()
+
+
+def test_attach_simulation_in_other_processes(tmpdir):
+    simulation = SimulationBuilder().build_from_entities(tax_benefit_system, couple)
+    expected = simulation.calculate('disposable_income', '2017-01')
+
+    for path in (None, str(tmpdir.join('inputs.dat'))):
+        shared_arrays = share_simulation(simulation, path)
+        try:
+            with multiprocessing.get_context('fork').Pool(2) as pool:
+                for result in pool.map(calculate_disposable_income, [shared_arrays] * 2):
+                    assert_array_equal(result, expected)
+        finally:
+            shared_arrays.unlink()
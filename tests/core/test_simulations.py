@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 
 
+import numpy
+
 from openfisca_core.simulation_builder import SimulationBuilder
+from openfisca_core.tools import assert_near
 
 from openfisca_country_template.situation_examples import single
 
@@ -63,9 +66,100 @@ def test_clone():
     assert salary_holder_clone.population == simulation_clone.persons
 
 
+def test_clone_is_copy_on_write():
+    simulation = SimulationBuilder().build_from_entities(tax_benefit_system, single)
+    income_tax = simulation.calculate('income_tax', '2017-01')
+
+    simulation_clone = simulation.clone()
+    assert simulation_clone.person.get_holder('income_tax').get_array('2017-01') is income_tax
+    assert simulation_clone.household.get_holder('total_taxes').simulation is simulation_clone
+
+    simulation_clone.delete_arrays('salary', '2017-01')
+    simulation_clone.set_input('salary', '2017-01', [1000])
+
+    assert_near(simulation_clone.calculate('income_tax', '2017-01'), 150, absolute_error_margin = 0.01)
+    assert simulation.calculate('income_tax', '2017-01') is income_tax
+    assert_near(simulation.calculate('salary', '2017-01'), 0)
+
+
 def test_get_memory_usage():
     simulation = SimulationBuilder().build_from_entities(tax_benefit_system, single)
     simulation.calculate('disposable_income', '2017-01')
     memory_usage = simulation.get_memory_usage(variables = ['salary'])
     assert(memory_usage['total_nb_bytes'] > 0)
     assert(len(memory_usage['by_variable']) == 1)
+
+
+def test_calculate_many():
+    simulation = SimulationBuilder().build_from_entities(tax_benefit_system, single)
+    requests = [('disposable_income', '2017-01'), ('salary', '2017-01'), ('disposable_income', '2017-01')]
+
+    results = simulation.calculate_many(requests)
+
+    assert set(results.keys()) == {('disposable_income', '2017-01'), ('salary', '2017-01')}
+    assert (results[('salary', '2017-01')] == simulation.calculate('salary', '2017-01')).all()
+    assert (results[('disposable_income', '2017-01')] == simulation.calculate('disposable_income', '2017-01')).all()
+    assert simulation.tracer.stack == []
+
+
+def test_calculate_many_full_tracer():
+    simulation = SimulationBuilder().build_default_simulation(tax_benefit_system)
+    simulation.trace = True
+    simulation.calculate_many([('income_tax', '2017-01'), ('salary', '2017-02')])
+
+    assert [tree.name for tree in simulation.tracer.trees] == ['income_tax', 'salary']
+    assert str(simulation.tracer.trees[1].period) == '2017-02'
+
+
+def test_set_input_invalidates_dependents():
+    simulation = SimulationBuilder().build_from_entities(tax_benefit_system, single)
+    simulation.calculate_many([('disposable_income', '2017-01'), ('basic_income', '2017-02'), ('housing_tax', 2017)])
+
+    simulation.set_input('age', '2017-01', [17])
+
+    assert simulation.get_array('basic_income', '2017-01') is None
+    assert simulation.get_array('disposable_income', '2017-01') is None
+    assert simulation.get_array('income_tax', '2017-01') is not None  # Does not depend on age
+    assert simulation.get_array('basic_income', '2017-02') is not None  # Calculated for another period
+    assert simulation.get_array('housing_tax', 2017) is not None
+
+    fresh_simulation = SimulationBuilder().build_from_entities(tax_benefit_system, single)
+    fresh_simulation.set_input('age', '2017-01', [17])
+    assert simulation.calculate('disposable_income', '2017-01') == fresh_simulation.calculate('disposable_income', '2017-01')
+
+
+def test_delete_arrays_invalidates_dependents():
+    simulation = SimulationBuilder().build_from_entities(tax_benefit_system, single)
+    simulation.calculate('disposable_income', '2017-01')
+
+    simulation.delete_arrays('income_tax', '2017-01')
+
+    assert simulation.get_array('disposable_income', '2017-01') is None
+    assert simulation.get_array('salary', '2017-01') is not None
+
+
+def test_update_persons():
+    situation = {
+        'persons': {
+            'Ari': {'salary': {'2017-01': 1000}},
+            'Paul': {'salary': {'2017-01': 2000}},
+            'Leila': {'salary': {'2017-01': 3000}},
+            'Javier': {'salary': {'2017-01': 4000}},
+            },
+        'households': {
+            'h1': {'parents': ['Ari', 'Paul']},
+            'h2': {'parents': ['Leila']},
+            'h3': {'parents': ['Javier']},
+            },
+        }
+    simulation = SimulationBuilder().build_from_entities(tax_benefit_system, situation)
+    simulation.calculate_many([('disposable_income', '2017-01'), ('total_taxes', '2017-01')])
+
+    salaries = numpy.array([1000., 5000., 3000., 4000.])
+    results = simulation.update_persons([False, True, False, False], {'salary': {'2017-01': salaries}}, [('disposable_income', '2017-01')])
+
+    assert simulation._get_rows_of_members([1])['household'].tolist() == [0]
+    situation['persons']['Paul']['salary']['2017-01'] = 5000
+    fresh_simulation = SimulationBuilder().build_from_entities(tax_benefit_system, situation)
+    assert_near(results[('disposable_income', '2017-01')], fresh_simulation.calculate('disposable_income', '2017-01'))
+    assert_near(simulation.get_array('total_taxes', '2017-01'), fresh_simulation.calculate('total_taxes', '2017-01'))
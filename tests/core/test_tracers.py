@@ -68,6 +68,21 @@ def test_stack_two_levels(tracer):
     assert tracer.stack == [{'name': 'a', 'period': 2017}]
 
 
+@mark.parametrize("tracer", [SimpleTracer(), FullTracer()])
+def test_stack_frames_count(tracer):
+    tracer.record_calculation_start('a', 2017)
+    tracer.record_calculation_start('b', 2017)
+    tracer.record_calculation_start('a', 2016)
+    assert tracer.get_nb_frames('a') == 2
+    assert tracer.get_nb_calculation_frames('a', 2016) == 1
+    assert tracer.get_nb_calculation_frames('b', 2016) == 0
+
+    tracer.record_calculation_end()
+    assert tracer.get_nb_frames('a') == 1
+    assert tracer.get_nb_calculation_frames('a', 2016) == 0
+    assert tracer.get_nb_calculation_frames('a', 2017) == 1
+
+
 @mark.parametrize("tracer", [SimpleTracer(), FullTracer()])
 def test_tracer_contract(tracer):
     simulation = StubSimulation()
@@ -10,6 +10,8 @@ import dpath
 
 from openfisca_country_template.situation_examples import couple
 
+from openfisca_web_api.app import stream_json
+
 from . import subject
 
 
@@ -363,3 +365,67 @@ def test_gracefully_handle_unexpected_errors():
 
     error = json.loads(response.data)["error"]
     assert f"Unable to compute variable '{variable}' for period {period}" in error
+
+
+def test_calculate_batch():
+    persons = {'person_é{}'.format(index): {'salary': {'2017-01': 1000 * index}, 'income_tax': {'2017-01': None}} for index in range(100)}
+    simulation_json = json.dumps({
+        "persons": persons,
+        "households": {'household_{}'.format(index): {'parents': ['person_é{}'.format(index)], 'rent': {'2017-01': None}} for index in range(100)},
+        }, ensure_ascii = False)
+
+    response = post_json(simulation_json.encode('utf-8'))
+    assert response.status_code == OK
+    response_json = json.loads(response.data.decode('utf-8'))
+    assert list(response_json['persons']) == list(persons)
+    assert response_json['persons']['person_é99']['salary'] == {'2017-01': 99000}
+    assert response_json['persons']['person_é99']['income_tax'] == {'2017-01': pytest.approx(99000 * 0.15)}
+    assert response_json['households']['household_99']['parents'] == ['person_é99']
+    assert response_json['households']['household_99']['rent'] == {'2017-01': 0}
+
+
+def test_stream_json():
+    data = {'persons': {'Javier': {'salary': {'2017-01': 2000}}, 'Sébastien': {}}, 'axes': [[{'count': 2}]]}
+    chunks = list(stream_json(data, chunk_size = 8))
+    assert len(chunks) > 1
+    assert json.loads(b''.join(chunks).decode('utf-8')) == data
+
+
+def test_stream_json_raises_before_streaming():
+    with pytest.raises(TypeError):
+        stream_json({'persons': {'Javier': {'birth': object()}}})
+
+
+def test_calculate_date_variable():
+    response = post_json('{"persons": {"bob": {"birth": {"ETERNITY": null}}}}')
+    assert response.status_code == OK
+    response_json = json.loads(response.data.decode('utf-8'))
+    assert response_json['persons']['bob']['birth'] == {'ETERNITY': 'Thu, 01 Jan 1970 00:00:00 GMT'}
+
+
+def test_calculate_batch_of_several_types():
+    statuses = ['owner', 'free_lodger', 'homeless']
+    households = {
+        'household_{}'.format(index): {
+            'parents': ['person_{}'.format(index)],
+            # Every other household gets the default status
+            'housing_occupancy_status': {'2017-01': statuses[index % 3] if index % 2 else None},
+            'postal_code': {'2017-01': None},
+            }
+        for index in range(60)
+        }
+    # Only some persons have values to calculate
+    persons = {
+        'person_{}'.format(index): {'birth': {'ETERNITY': '2000-01-01'}, 'age': {'2017-01': None}, 'salary': {'2017-01': 1000 * index}} if index % 3 == 0 else {}
+        for index in range(60)
+        }
+    simulation_json = json.dumps({'persons': persons, 'households': households})
+
+    response = post_json(simulation_json)
+    assert response.status_code == OK
+    response_json = json.loads(response.data.decode('utf-8'))
+    households_json = response_json['households']
+    assert [households_json['household_{}'.format(index)]['housing_occupancy_status']['2017-01'] for index in range(6)] == ['tenant', 'free_lodger', 'tenant', 'owner', 'tenant', 'homeless']
+    assert households_json['household_59']['postal_code'] == {'2017-01': ''}
+    assert response_json['persons']['person_57'] == {'birth': {'ETERNITY': '2000-01-01'}, 'age': {'2017-01': 17}, 'salary': {'2017-01': 57000}}
+    assert response_json['persons']['person_58'] == {}